@@ -1,45 +1,233 @@
 #!/usr/bin/env python3
 import pandas as pd
-import glob
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
 
-def count_zipcode_drug_combinations():
+COMBINATION_COLUMNS = ['zip_code', 'drug_name']
+CACHE_FILE = 'unique_zip_drug.parquet'
+# Parquet metadata key holding the report files (path, size, mtime) the cache was built from
+CACHE_FILES_KEY = b'report_files'
+CHUNK_ROWS = 1_000_000
+
+# --sample stops once this many files in a row each grew the set by less than 0.1%
+SATURATION_GROWTH = 0.001
+SATURATION_FILES = 5
+
+# Only a blank cell counts as a missing key (text like "NA" is a real value), and pairs
+# with a missing zip code or drug name are dropped by every engine
+MISSING_VALUES = ['']
+
+# Reports written with data_collection.py --gzip end in .csv.gz
+REPORT_SUFFIXES = ('.csv', '.csv.gz')
+
+def read_combinations_pandas(file):
+    """Return the unique (zip_code, drug_name) pairs in one CSV file using pandas"""
+    combinations = set()
+    # Only parse the two columns we need straight from a memory map of the (local)
+    # report file, in bounded chunks so files larger than memory can still be
+    # scanned. drug_name has a few hundred distinct values repeated on every row,
+    # so it is read as a categorical; each chunk is converted back to plain
+    # values below, so differing categories across chunks/files do not matter
+    with pd.read_csv(
+        file,
+        usecols=COMBINATION_COLUMNS,
+        dtype={'zip_code': 'string[pyarrow]', 'drug_name': 'category'},
+        keep_default_na=False,
+        na_values=MISSING_VALUES,
+        engine='c',
+        memory_map=True,
+        chunksize=CHUNK_ROWS
+    ) as reader:
+        for chunk in reader:
+            chunk = chunk.dropna()
+            # Zip the two 1D columns rather than materializing a 2D object array of rows
+            combinations.update(zip(chunk['zip_code'].to_numpy(), chunk['drug_name'].to_numpy()))
+    return combinations
+
+def read_combinations_pyarrow(file):
+    """Return the unique (zip_code, drug_name) pairs in one CSV file using pyarrow"""
+    combinations = set()
+    # Streaming arrow reader over a memory-mapped file (report files are always
+    # local; gzipped ones are decompressed as they stream), restricted to the two
+    # columns we need and decoded batch by batch
+    with (pa.input_stream(file) if file.endswith('.gz') else pa.memory_map(file)) as source:
+        reader = pv.open_csv(
+            source,
+            convert_options=pv.ConvertOptions(
+                include_columns=COMBINATION_COLUMNS,
+                column_types={column: pa.string() for column in COMBINATION_COLUMNS},
+                null_values=MISSING_VALUES,
+                strings_can_be_null=True
+            )
+        )
+        for batch in reader:
+            # Hash-aggregate with no aggregations yields the distinct key pairs
+            unique = pa.Table.from_batches([batch]).drop_null().group_by(COMBINATION_COLUMNS).aggregate([])
+            combinations.update(zip(unique['zip_code'].to_pylist(), unique['drug_name'].to_pylist()))
+    return combinations
+
+def read_combinations_polars(file):
+    """Return the unique (zip_code, drug_name) pairs in one CSV file using polars"""
+    # polars is optional, so only import it when this engine is selected
+    import polars as pl
+
+    # Lazy scan lets polars push the column projection into its multithreaded reader,
+    # and the streaming engine keeps the unique() hash aggregate bounded in memory
+    unique = (
+        pl.scan_csv(file, schema_overrides={column: pl.Utf8 for column in COMBINATION_COLUMNS},
+                    null_values=MISSING_VALUES)
+        .select(COMBINATION_COLUMNS)
+        .drop_nulls()
+        .unique()
+        .collect(engine='streaming')
+    )
+    return zip(unique['zip_code'].to_list(), unique['drug_name'].to_list())
+
+READERS = {
+    'pandas': read_combinations_pandas,
+    'pyarrow': read_combinations_pyarrow,
+    'polars': read_combinations_polars
+}
+
+def intern_pairs(combinations, pool):
+    """Yield pairs whose strings are shared through pool, so the set stores each zip code and drug name once"""
+    for zip_code, drug_name in combinations:
+        yield pool.setdefault(zip_code, zip_code), pool.setdefault(drug_name, drug_name)
+
+def report_fingerprint(csv_files):
+    """Return the sorted report paths with each file's size and mtime, encoded for the cache metadata"""
+    stats = [(file, os.stat(file)) for file in csv_files]
+    return json.dumps([[file, stat.st_size, stat.st_mtime_ns] for file, stat in stats]).encode()
+
+def is_cache_fresh(csv_files):
+    """Check whether the parquet cache exists and was built from exactly the current report files"""
+    if not os.path.exists(CACHE_FILE):
+        return False
+    metadata = pq.read_schema(CACHE_FILE).metadata or {}
+    return metadata.get(CACHE_FILES_KEY) == report_fingerprint(csv_files)
+
+def save_cache(zip_codes, drug_names, csv_files):
+    """Persist the unique combinations as a dictionary-encoded, zstd-compressed parquet file"""
+    table = pa.table({
+        'zip_code': pa.array(zip_codes, type=pa.string()),
+        'drug_name': pa.array(drug_names, type=pa.string())
+    }, metadata={CACHE_FILES_KEY: report_fingerprint(csv_files)})
+    pq.write_table(table, CACHE_FILE, compression='zstd', use_dictionary=True)
+
+def positive_int(value):
+    """argparse type for a count that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def count_zipcode_drug_combinations(engine='pyarrow', use_cache=False, sample=False, max_files=None):
     """Count unique zipcode + drug combinations across all analysis report files"""
-    
-    # Get all CSV files from analysis_report directory
-    csv_files = glob.glob("analysis_report/*.csv")
-    
+
+    # Get all CSV files from analysis_report directory (a single readdir, no extra stats)
+    report_dir = Path("analysis_report")
+    csv_files = []
+    if report_dir.is_dir():
+        with os.scandir(report_dir) as entries:
+            csv_files = sorted(entry.path for entry in entries if entry.name.endswith(REPORT_SUFFIXES) and entry.is_file())
+
     if not csv_files:
         print("No CSV files found in analysis_report directory")
         return
-    
-    all_combinations = []
-    
-    print("Processing files:")
-    for file in csv_files:
-        print(f"  - {file}")
-        df = pd.read_csv(file)
-        
-        # Get unique zipcode + drug combinations from this file
-        unique_combinations = df[['zip_code', 'drug_name']].drop_duplicates()
-        all_combinations.append(unique_combinations)
-        
-        print(f"    Found {len(unique_combinations)} unique zipcode + drug combinations")
-    
-    # Combine all dataframes and get unique combinations across all files
-    combined_df = pd.concat(all_combinations, ignore_index=True)
-    unique_across_all = combined_df.drop_duplicates()
-    
+
+    # pandas and pyarrow decompress .csv.gz reports on the fly, but polars cannot stream-scan them
+    if engine == 'polars' and any(file.endswith('.gz') for file in csv_files):
+        print("Error: The polars engine cannot scan gzip-compressed reports in analysis_report; use --engine pandas or pyarrow")
+        return
+
+    if max_files is not None:
+        csv_files = csv_files[:max_files]
+
+    # Sampled runs are approximate, so they neither trust nor overwrite the cache
+    approximate = sample or max_files is not None
+
+    # Running set of (zip_code, drug_name) pairs seen across all files; the tuples
+    # reference canonical string objects from string_pool instead of private copies
+    seen = set()
+    string_pool = {}
+
+    loaded_from_cache = use_cache and not approximate and is_cache_fresh(csv_files)
+    if loaded_from_cache:
+        # Nothing changed since the last run, so skip re-scanning every CSV
+        print(f"Loading cached combinations from {CACHE_FILE}")
+        table = pq.read_table(CACHE_FILE)
+        seen.update(intern_pairs(zip(table['zip_code'].to_pylist(), table['drug_name'].to_pylist()), string_pool))
+    else:
+        read_combinations = READERS[engine]
+
+        # Files are independent and parsing releases the GIL, so read them concurrently;
+        # map() still hands results back in file order for the report below
+        print("Processing files:")
+        saturated_files = 0
+        with ThreadPoolExecutor(max_workers=min(32, len(csv_files))) as executor:
+            for file, combinations in zip(csv_files, executor.map(read_combinations, csv_files)):
+                print(f"  - {file}")
+
+                # Fold this file's pairs straight into the global set so the dedup state
+                # never holds more than the final unique combinations
+                previous_size = len(seen)
+                seen.update(intern_pairs(combinations, string_pool))
+                added = len(seen) - previous_size
+
+                print(f"    Added {added} new unique zipcode + drug combinations")
+
+                if sample:
+                    saturated_files = saturated_files + 1 if added / max(previous_size, 1) < SATURATION_GROWTH else 0
+                    if saturated_files >= SATURATION_FILES:
+                        print(f"⏹️  Unique set stabilized over the last {SATURATION_FILES} files, stopping early")
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        break
+
+    # Build the result once, at its final size, column by column so pandas never
+    # allocates an intermediate 2D object array for the rows
+    zip_codes, drug_names = zip(*sorted(seen)) if seen else ((), ())
+    if use_cache and not loaded_from_cache and not approximate:
+        save_cache(zip_codes, drug_names, csv_files)
+    unique_across_all = pd.DataFrame({
+        'zip_code': pd.array(zip_codes, dtype='string[pyarrow]'),
+        'drug_name': pd.array(drug_names, dtype='string[pyarrow]')
+    })
+
     print(f"\n📊 Summary:")
-    print(f"  - Total unique zipcode + drug combinations: {len(unique_across_all)}")
-    print(f"  - Unique zip codes: {unique_across_all['zip_code'].nunique()}")
-    print(f"  - Unique drugs: {unique_across_all['drug_name'].nunique()}")
-    
+    if approximate:
+        print("  ⚠️  Sampled run - counts are approximate")
+    print(f"  - Total unique zipcode + drug combinations: {len(seen)}")
+    print(f"  - Unique zip codes: {len(set(zip_codes))}")
+    print(f"  - Unique drugs: {len(set(drug_names))}")
+
     # Show some examples
     print(f"\n🔍 Sample combinations:")
-    print(unique_across_all.head(10).to_string(index=False))
-    
+    print(f"{'zip_code':>8}  drug_name")
+    for zip_code, drug_name in islice(zip(zip_codes, drug_names), 10):
+        print(f"{zip_code:>8}  {drug_name}")
+
     return unique_across_all
 
 if __name__ == "__main__":
-    count_zipcode_drug_combinations() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Count unique zipcode + drug combinations across analysis report files')
+    parser.add_argument('--engine', choices=sorted(READERS), default='pyarrow',
+                        help='CSV engine used to scan the reports (default: pyarrow; polars must be installed separately and cannot read .csv.gz)')
+    parser.add_argument('--cache', action='store_true',
+                        help=f'Reuse {CACHE_FILE} if it was built from the current report CSVs, and refresh it otherwise')
+    parser.add_argument('--sample', action='store_true',
+                        help='Stop early once new files stop adding combinations (approximate result)')
+    parser.add_argument('--max-files', type=positive_int,
+                        help='Only read the first N report files (approximate result)')
+
+    args = parser.parse_args()
+
+    count_zipcode_drug_combinations(engine=args.engine, use_cache=args.cache,
+                                    sample=args.sample, max_files=args.max_files)
+
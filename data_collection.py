@@ -7,21 +7,40 @@ Environment: PRODUCTION API
 Rate Limits (SAFE Configuration):
 - 10,000 requests per hour
 - Up to 20 requests per second
-- Current setting: 2.5 req/sec (0.4s delay) - SAFE under hourly limit
+- Requests are admitted by a token bucket at 20 req/sec (burst of 20)
+- A sliding one-hour window holds the total under 9,800 requests/hour
+- Requests are issued from a small worker pool so network latency overlaps,
+  while the shared token bucket still caps the overall rate
 """
 
 import requests
 import pandas as pd
 import json
+import orjson
 import time
 import logging
 import csv
+import dbm
+import gzip
 import os
 import subprocess
+import signal
+import sys
 import argparse
+import atexit
+import queue
+import random
+import functools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED, ALL_COMPLETED
 from datetime import datetime
-import uuid
-from typing import Dict, List, Optional, Tuple
+from email.utils import parsedate_to_datetime
+from itertools import islice
+from operator import attrgetter, itemgetter
+from urllib.parse import urlencode
+from urllib3.util.retry import Retry
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 # Create logs directory if it doesn't exist
 os.makedirs('logs', exist_ok=True)
@@ -37,8 +56,267 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=1)
+def _fetch_credentials() -> Dict[str, str]:
+    """Run grab_token.sh once and parse both TOKEN= and MEMBERUUID= from its output"""
+    result = subprocess.run(['./grab_token.sh'], 
+                          capture_output=True, 
+                          text=True, 
+                          check=True)
+    
+    credentials = {}
+    for line in result.stdout.strip().split('\n'):
+        # Clean the values of any extra whitespace, quotes, or newlines
+        if line.startswith('TOKEN='):
+            credentials['token'] = line.split('=', 1)[1].strip().strip('"').strip("'")
+        elif line.startswith('MEMBERUUID='):
+            credentials['member_uuid'] = line.split('=', 1)[1].strip().strip('"').strip("'")
+    return credentials
+
+@functools.lru_cache(maxsize=None)
+def _read_json_file(path: str, mtime: float):
+    """Parse a JSON file with orjson, memoized on path and modification time so edits are picked up"""
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+def _new_intent_call_id() -> str:
+    """Return a random version 4 UUID string, formatted straight from os.urandom without building a uuid.UUID"""
+    raw = bytearray(os.urandom(16))
+    raw[6] = (raw[6] & 0x0f) | 0x40  # version 4
+    raw[8] = (raw[8] & 0x3f) | 0x80  # RFC 4122 variant
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+class Drug(NamedTuple):
+    """A drug to query, as loaded from the drugs CSV"""
+    procedure_code: str
+    uuid: str
+    drug_name: str
+    search_query: str
+    dosage_form: str
+    total_benefit_amount: str
+    claim_count: str
+
+class ZipLocation(NamedTuple):
+    """A zip code with the coordinates and city sent to the API"""
+    zip: str
+    lat: float
+    lng: float
+    state: str
+    city: str
+
+# Drug CSV columns read by load_drugs_from_excel, in the order they are unpacked
+DRUG_COLUMNS = ('PROCEDURE_CODE', 'DRUG_NAME_WITH_FORM_STRENGTH', 'DOSAGE_FORM', 'TOTAL_BENEFIT_AMOUNT', 'CLAIM_COUNT')
+
+# Shared read-only stand-in for missing nested objects in API responses
+EMPTY_DICT = {}
+
+# Returned by make_api_request when the run stopped while the circuit breaker was holding the
+# request back; the combination was never sent, so it is not recorded and the next run retries it
+NOT_SENT = object()
+
+# Output CSV columns, in file order
+PHARMACY_COLUMNS = [
+    # Basic location and timing info
+    'timestamp', 'state', 'zip_code', 'city', 'lat', 'lng',
+    
+    # Original drug information
+    'procedure_code', 'drug_name', 'dosage_form', 'claim_count_orig',
+    
+    # Enhanced drug information from API
+    'api_drug_title', 'api_drug_name', 'brand_name', 'generic_name', 
+    'selected_ndc', 'generic_or_branded_id',
+    
+    # Drug description details
+    'drug_description', 'admin_instructions', 'contraindications', 
+    'side_effects', 'interactions', 'monitoring_instructions', 'missed_dose_instructions',
+    
+    # Cost and benefit information
+    'facility_benefit_amount', 'non_facility_benefit_amount', 'facility_should_cost', 
+    'non_facility_should_cost', 'facility_addon_should_cost', 'non_facility_addon_should_cost',
+    'facility_addon_benefit_amount', 'non_facility_addon_benefit_amount',
+    
+    # Drug options (as JSON strings)
+    'form_options', 'dosage_options', 'quantity_options', 'brand_options',
+    
+    # Member information
+    'member_uuid', 'member_zip_code', 'member_prescriptions_covered', 'member_medical_area_factor',
+    'member_policy_uuid', 'member_policy_coverage_status', 'member_insurance_filing_uuid',
+    'member_maternity_start_date', 'member_maternity_care_covered', 'member_skip_deductible_eligible',
+    'member_insurance_product', 'member_rating_area', 'member_zero_reimbursement_policy_status',
+    
+    # Coverage metadata
+    'prescriptions_covered', 'category_slug', 'pregnancy_complication', 'drug_coverage_required',
+    'maternity_covered', 'preventive_type', 'otc_drug', 'is_cover_at_cost', 'is_deductible_skipped',
+    'is_maternity_eligible', 'care_status', 'conditionally_covered_type', 'ignore_rating_area_factor',
+    'monitoring_id', 'category',
+    
+    # Pharmacy information
+    'pharmacy_name', 'pharmacy_phone', 'pharmacy_street', 'pharmacy_city', 'pharmacy_state',
+    'pharmacy_zip', 'pharmacy_lon', 'pharmacy_lat', 'pharmacy_distance', 'pharmacy_rate',
+    'price_fairness', 'pharmacy_image', 'hours_of_operation',
+    
+    # Pharmacy-specific drug details
+    'pharmacy_gsn', 'pharmacy_ndc', 'pharmacy_qty',
+    
+    # Care estimate results
+    'provider_price', 'estimated_member_responsibility', 'earned_benefit', 'applied_to_deductible',
+    'savings', 'bill_over_benefit_amount'
+]
+
+def fields_getter(fields: Dict[str, object]):
+    """Build a function returning the given keys of a dict as a tuple, with defaults for missing keys"""
+    keys = tuple(fields)
+    get_all = itemgetter(*keys)
+    defaults = tuple(fields.items())
+    
+    def get_fields(data: Dict) -> tuple:
+        # One C-level itemgetter call when the API sent every key, per-key defaults otherwise
+        try:
+            return get_all(data)
+        except KeyError:
+            return tuple(data.get(key, default) for key, default in defaults)
+    
+    return get_fields
+
+# Per-pharmacy row fields, grouped by source object and in PHARMACY_COLUMNS order
+get_pharmacy_contact = fields_getter({'name': '', 'phone': ''})
+get_pharmacy_address = fields_getter({'street': '', 'city': '', 'state': '', 'zip': '', 'lon': 0, 'lat': 0})
+get_pharmacy_listing = fields_getter({'distance': 0, 'pharmacyRate': 0, 'priceFairness': '', 'image': ''})
+get_pharmacy_drug = fields_getter({'gsn': '', 'ndc': '', 'qty': 0})
+get_care_estimate = fields_getter({
+    'providerPrice': 0, 'estimatedMemberResponsibility': 0, 'earnedBenefit': 0,
+    'appliedToDeductible': 0, 'savings': 0, 'billOverBenefitAmount': 0
+})
+
+class TokenBucket:
+    """Thread-safe token bucket: allows bursts of up to capacity requests and refills at refill_rate per second"""
+    def __init__(self, refill_rate: float, capacity: float):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    def pause(self, seconds: float):
+        """Hold back every acquire() for the given number of seconds and drain any saved-up burst"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+    
+    def set_rate(self, refill_rate: float):
+        """Change the refill rate, crediting tokens earned so far at the old rate"""
+        with self._lock:
+            now = time.monotonic()
+            if now >= self.paused_until:
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+                self.last_refill = now
+            self.refill_rate = refill_rate
+    
+    def acquire(self, cost: float = 1):
+        """Block until cost tokens are available, then consume them"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait_time = self.paused_until - now
+                    self.last_refill = self.paused_until
+                    self.tokens = 0
+                else:
+                    wait_time = 0
+            if wait_time:
+                time.sleep(wait_time)
+                continue
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+                self.last_refill = now
+                if self.tokens >= cost:
+                    self.tokens -= cost
+                    return
+                wait_time = (cost - self.tokens) / self.refill_rate
+            time.sleep(wait_time)
+
+class SlidingWindowQuota:
+    """Thread-safe sliding-log counter: blocks while limit requests were recorded within the last window seconds"""
+    def __init__(self, limit: int, window: float = 3600.0):
+        self.limit = limit
+        self.window = window
+        self.timestamps = deque()
+        self._lock = threading.Lock()
+    
+    def wait(self):
+        """Block until the window has room for another request"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self.timestamps and self.timestamps[0] <= now - self.window:
+                    self.timestamps.popleft()
+                if len(self.timestamps) < self.limit:
+                    return
+                wait_time = self.timestamps[0] + self.window - now
+            logger.info(f"⏳ Hourly quota of {self.limit} requests reached, waiting {wait_time:.0f}s")
+            time.sleep(wait_time)
+    
+    def record(self):
+        """Record a successful request at the current time"""
+        with self._lock:
+            self.timestamps.append(time.monotonic())
+
+class CircuitBreaker:
+    """Thread-safe circuit breaker: opens after failure_threshold consecutive failures, then lets a single probe through every recovery_timeout seconds"""
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+    
+    def __init__(self, failure_threshold: int = 10, recovery_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+    
+    def allow_request(self) -> bool:
+        """Return whether a request may be sent now; while open, only one probe per recovery_timeout gets through"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+    
+    def wait_until_allowed(self, stop: threading.Event) -> bool:
+        """Block until a request may be sent; returns False if stop is set first"""
+        while not self.allow_request():
+            with self._lock:
+                remaining = self.opened_at + self.recovery_timeout - time.monotonic()
+            # While a probe is out (half-open) its result is due shortly, so check back soon
+            if stop.wait(max(remaining, 0.1)):
+                return False
+        return True
+    
+    def record_success(self):
+        """Close the circuit after a successful request"""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+    
+    def record_failure(self):
+        """Count a failed request, opening the circuit at the threshold or when a probe fails"""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"🔌 Circuit opened after {self.failures} consecutive failed requests, probing again in {self.recovery_timeout:.0f}s")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
 class SidecarAPICollector:
-    def __init__(self, test_mode: bool = False, states_filter: List[str] = None, batch_info: dict = None):
+    def __init__(self, test_mode: bool = False, states_filter: List[str] = None, batch_info: dict = None,
+                 parallel_jobs: int = 1, response_cache_file: Optional[str] = None, max_workers: int = 16,
+                 response_cache_max_age: float = 24 * 3600, hedge_after: Optional[float] = None,
+                 compress_output: bool = False):
         self.test_mode = test_mode
         self.states_filter = states_filter
         self.batch_info = batch_info
@@ -74,31 +352,149 @@ class SidecarAPICollector:
             'searchRadius': '8',
             'prescriptionInitialLoad': 'true'
         }
+        # Encoded once here (and on token refresh) rather than on every request
+        self._static_query = urlencode(self.static_params)
         
-        # Rate limiting - SAFE configuration for API limits: 10k/hour, 20/second max
-        # Safe rate: 0.4 sec delay = 2.5 req/sec = 9,000 req/hour (safe buffer under 10k/hour)
-        # This prevents hitting the hourly limit while staying well under per-second limit
-        self.request_delay = 0.4  # seconds between requests (2.5 req/sec = 9k req/hour - SAFE)
+        # One pooled session shared by all workers, so requests reuse keep-alive
+        # connections instead of paying a new TCP + TLS handshake each time. Headers
+        # stay per call because token refreshes replace the token mid-run
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=max(32, max_workers), max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Rate limiting - API limits: 10k/hour, 20/second max
+        # Each request takes a token from a bucket refilled at the per-second ceiling, so
+        # fast responses are not held back by a fixed delay and bursts never exceed 20.
+        # The limits are per account, so when several batch processes run side by side
+        # (--parallel-jobs) each one takes an equal share of them
+        self.parallel_jobs = parallel_jobs
+        self.max_requests_per_second = 20 / parallel_jobs
+        self.api_rate_limiter = TokenBucket(refill_rate=self.max_requests_per_second, capacity=max(1, 20 // parallel_jobs))
+        # The hourly limit is tracked over a sliding window, leaving headroom for requests in flight
+        self.hourly_quota = SlidingWindowQuota(limit=9800 // parallel_jobs)
+        # Nominatim's usage policy allows at most 1 request per second
+        self.geocoding_rate_limiter = TokenBucket(refill_rate=1, capacity=1)
         self.max_retries = 3
-        self.retry_delay = 2.0  # seconds between retries
+        # Stops sending requests during an outage and probes once a minute until it recovers
+        self.api_breaker = CircuitBreaker(failure_threshold=10, recovery_timeout=60.0)
+        self.retry_delay = 2.0  # base delay for exponential backoff between retries
+        self.max_retry_delay = 30.0
+        
+        # Concurrency - requests run on a worker pool so their latency overlaps; the
+        # token bucket above is shared by all workers so it caps the overall rate
+        self.max_workers = max_workers
+        self._token_lock = threading.Lock()
+        
+        # Optional request hedging: a request still unanswered after hedge_after seconds gets
+        # one duplicate and the first response wins. Hedges go through the same rate limits,
+        # and at most a quarter of the workers can have one outstanding at a time
+        self.hedge_after = hedge_after
+        self.hedged_count = 0
+        if hedge_after:
+            self._hedge_executor = ThreadPoolExecutor(max_workers=max_workers * 2, thread_name_prefix='hedge')
+            self._hedge_slots = threading.BoundedSemaphore(max(1, max_workers // 4))
+        
+        # Sidecar API calls go over HTTP/2 when httpx (with h2) is installed, so all workers
+        # multiplex their requests on a few warm connections; otherwise they share the
+        # requests session above. Errors from either client are handled the same way
+        self.api_client = self.session
+        self._timeout_errors = (requests.exceptions.Timeout,)
+        self._request_errors = (requests.exceptions.RequestException,)
+        try:
+            import httpx
+            self.api_client = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_connections=self.max_workers * 2, max_keepalive_connections=self.max_workers)
+            )
+            self._timeout_errors += (httpx.TimeoutException,)
+            self._request_errors += (httpx.HTTPError,)
+            logger.info("🔌 Using HTTP/2 client for Sidecar API requests")
+        except ImportError:
+            logger.info("💡 httpx[http2] not installed - using HTTP/1.1 keep-alive connections for API requests")
         
         # Progress tracking - data files go in results/, logs go in logs/
         mode_suffix = "_test" if test_mode else ""
         states_suffix = "_" + "_".join(states_filter) if states_filter else ""
         batch_suffix = f"_batch{batch_info['batch_num']}of{batch_info['total_batches']}" if batch_info else ""
-        self.output_file = f'results/sidecar_data{mode_suffix}{states_suffix}{batch_suffix}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-        self.progress_file = f'results/progress{mode_suffix}{states_suffix}{batch_suffix}.json'
+        # Rows repeat the same state, city and drug text, so gzip shrinks the output several times over
+        self.compress_output = compress_output
+        output_extension = '.csv.gz' if compress_output else '.csv'
+        self.output_file = f'results/sidecar_data{mode_suffix}{states_suffix}{batch_suffix}_{datetime.now().strftime("%Y%m%d_%H%M%S")}{output_extension}'
+        # Completed combinations are appended to a plain-text log, one key per line, so each
+        # checkpoint writes only what finished since the last one; older runs kept a JSON file
+        self.progress_file = f'results/progress{mode_suffix}{states_suffix}{batch_suffix}.txt'
+        self.legacy_progress_file = f'results/progress{mode_suffix}{states_suffix}{batch_suffix}.json'
         self.error_file = 'logs/errors.log'
         
-        # Failure tracking for auto-stop functionality
-        self.failed_combinations = []
+        # Progress checkpoints are batched; flush_progress() writes whatever is pending
+        self._progress = None
+        self._progress_dirty = 0
+        self._unsaved_keys = []
+        self._progress_log = None
+        self.progress_flush_every = 500
+        atexit.register(self.flush_progress)
+        
+        # Optional on-disk store of successful API responses keyed by drug UUID and zip,
+        # so re-runs and re-processed batches skip the request for anything fetched within
+        # response_cache_max_age seconds; older entries are fetched again and replaced
+        self.response_cache = None
+        self.response_cache_max_age = response_cache_max_age
+        if response_cache_file:
+            self.response_cache = dbm.open(response_cache_file, 'c')
+            logger.info(f"🗄️  Reusing cached API responses from {response_cache_file} ({len(self.response_cache)} entries)")
+        
+        # Output CSV handle, opened once by initialize_csv() and written by a background
+        # thread fed through a bounded queue, so disk flushes never hold up new requests
+        self._csv_fh = None
+        self._csv_writer = None
+        self._csv_queue = None
+        self._csv_thread = None
+        self._csv_error = None
+        self.csv_flush_rows = 1000
+        
+        # Per-combination progress is only logged every log_every combinations outside
+        # test mode; saved rows are totalled and reported with it
+        self.log_every = 100
+        self.rows_saved = 0
+        self.retry_count = 0
+        
+        # Failure tracking for auto-stop functionality - every failure is appended to a
+        # JSON lines log as it happens; only the most recent ones are kept in memory
         self.consecutive_failures = 0
         self.max_consecutive_failures = 10
         self.auto_stop_triggered = False
+        # Set on auto-stop and when the run ends, releasing workers waiting on the circuit breaker
+        self._stopping = threading.Event()
+        self.failed_count = 0
+        self.recent_failures = deque(maxlen=self.max_consecutive_failures)
+        self.failure_log_file = 'logs/failures.jsonl'
+        self._failure_log = open(self.failure_log_file, 'a', buffering=1, encoding='utf-8')
         
         # Geocoding cache - in root folder
         self.geocoding_cache_file = 'geocoding_cache.json'
+        # Every new entry is appended to a journal as soon as it is geocoded, so a crash loses
+        # nothing; the journal is folded into the JSON file whenever that is rewritten
+        self.geocoding_journal_file = 'geocoding_cache.jsonl'
+        self._geocoding_journal = None
+        # New entries since the last write; the file is only rewritten once enough accumulate
+        self._cache_dirty_count = 0
+        self.cache_flush_threshold = 500
         self.geocoding_cache = self.load_geocoding_cache()
+        # Cache misses are geocoded from a small thread pool, so cache updates are locked
+        self.geocoding_workers = 4
+        self._geocoding_lock = threading.Lock()
+        # Nominatim gets its own pooled session carrying its User-Agent, so the Sidecar
+        # token is never sent there and geocoding connections stay separate from the API's
+        self.geocoding_session = requests.Session()
+        self.geocoding_session.headers.update({'User-Agent': 'SidecarHealthDataCollection/1.0'})
+        # Transient Nominatim errors are retried with backoff by urllib3 (honoring Retry-After)
+        # instead of dropping that zip code from the dataset
+        geocoding_retry = Retry(total=5, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504],
+                                allowed_methods=['GET'], raise_on_status=False)
+        geocoding_adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.geocoding_workers, max_retries=geocoding_retry)
+        self.geocoding_session.mount('https://', geocoding_adapter)
+        atexit.register(self.save_geocoding_cache, force=True)
         
         # UUID cache
         self.uuid_cache_file = 'uuid_cache.json'
@@ -106,13 +502,33 @@ class SidecarAPICollector:
 
         
     def load_geocoding_cache(self) -> Dict:
-        """Load geocoding cache from file"""
+        """Load geocoding cache from file, plus any entries journaled since it was last written"""
+        cache = self.read_geocoding_cache_file()
+        if os.path.exists(self.geocoding_journal_file):
+            replayed = 0
+            with open(self.geocoding_journal_file, 'rb') as f:
+                for line in f:
+                    try:
+                        cache_key, entry = orjson.loads(line)
+                    except (orjson.JSONDecodeError, ValueError):
+                        # A crash mid-append leaves at most one torn line
+                        continue
+                    cache[cache_key] = entry
+                    replayed += 1
+            # Recovered entries are not in the JSON file yet, so the next save writes them there
+            self._cache_dirty_count += replayed
+            if replayed:
+                logger.info(f"✅ Recovered {replayed} geocoding entries from {self.geocoding_journal_file}")
+        return cache
+    
+    def read_geocoding_cache_file(self) -> Dict:
+        """Load the geocoding cache JSON file"""
         if os.path.exists(self.geocoding_cache_file):
             try:
-                with open(self.geocoding_cache_file, 'r') as f:
-                    cache = json.load(f)
-                    logger.info(f"✅ Loaded geocoding cache with {len(cache)} entries from {self.geocoding_cache_file}")
-                    return cache
+                # Copy the memoized parse, since this instance adds new entries to its cache
+                cache = dict(_read_json_file(self.geocoding_cache_file, os.path.getmtime(self.geocoding_cache_file)))
+                logger.info(f"✅ Loaded geocoding cache with {len(cache)} entries from {self.geocoding_cache_file}")
+                return cache
             except Exception as e:
                 logger.warning(f"❌ Could not load geocoding cache from {self.geocoding_cache_file}: {e}")
                 logger.warning("⚠️  Starting with empty cache - will geocode all zipcodes via API")
@@ -123,22 +539,49 @@ class SidecarAPICollector:
             logger.warning("💡 This will take ~12+ minutes for 2,500+ zipcodes")
             return {}
     
-    def save_geocoding_cache(self):
-        """Save geocoding cache to file"""
+    def save_geocoding_cache(self, force: bool = False):
+        """Save geocoding cache to file once enough new entries have accumulated (or always when forced)"""
+        if self._cache_dirty_count == 0 or (not force and self._cache_dirty_count < self.cache_flush_threshold):
+            return
         try:
-            with open(self.geocoding_cache_file, 'w') as f:
-                json.dump(self.geocoding_cache, f)
+            # Write to a temp file and swap it in, so an interrupted save never truncates the cache.
+            # The lock is held throughout so no entry lands in the journal between the snapshot
+            # and the journal being emptied
+            tmp_file = f"{self.geocoding_cache_file}.tmp"
+            with self._geocoding_lock:
+                with open(tmp_file, 'wb') as f:
+                    f.write(orjson.dumps(self.geocoding_cache))
+                os.replace(tmp_file, self.geocoding_cache_file)
+                if self._geocoding_journal is not None:
+                    self._geocoding_journal.close()
+                    self._geocoding_journal = None
+                if os.path.exists(self.geocoding_journal_file):
+                    os.remove(self.geocoding_journal_file)
+                self._cache_dirty_count = 0
         except Exception as e:
             logger.error(f"Could not save geocoding cache: {e}")
     
+    def add_geocoding_entries(self, entries: Dict[str, Dict]):
+        """Add new geocoding results to the cache and append them to the journal"""
+        with self._geocoding_lock:
+            self.geocoding_cache.update(entries)
+            self._cache_dirty_count += len(entries)
+            try:
+                if self._geocoding_journal is None:
+                    self._geocoding_journal = open(self.geocoding_journal_file, 'ab')
+                self._geocoding_journal.write(b''.join(orjson.dumps([cache_key, entry]) + b'\n'
+                                                       for cache_key, entry in entries.items()))
+                self._geocoding_journal.flush()
+            except Exception as e:
+                logger.warning(f"Could not journal geocoding results: {e}")
+    
     def load_uuid_cache(self) -> Dict:
         """Load UUID cache from file"""
         if os.path.exists(self.uuid_cache_file):
             try:
-                with open(self.uuid_cache_file, 'r') as f:
-                    cache = json.load(f)
-                    logger.info(f"Loaded UUID cache with {len(cache)} entries from {self.uuid_cache_file}")
-                    return cache
+                cache = dict(_read_json_file(self.uuid_cache_file, os.path.getmtime(self.uuid_cache_file)))
+                logger.info(f"Loaded UUID cache with {len(cache)} entries from {self.uuid_cache_file}")
+                return cache
             except Exception as e:
                 logger.warning(f"Could not load UUID cache: {e}")
         else:
@@ -146,7 +589,7 @@ class SidecarAPICollector:
         return {}
 
     def geocode_zipcode(self, zipcode: str, state: str) -> Optional[Tuple[float, float, str]]:
-        """Get coordinates and city for a zip code using a free geocoding service"""
+        """Get coordinates and city for a zip code from the cache, or a free geocoding service on a miss"""
         cache_key = f"{zipcode}_{state}"
         
         # Check cache first
@@ -164,14 +607,11 @@ class SidecarAPICollector:
                 'addressdetails': 1
             }
             
-            headers = {
-                'User-Agent': 'SidecarHealthDataCollection/1.0'
-            }
-            
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            self.geocoding_rate_limiter.acquire()
+            response = self.geocoding_session.get(url, params=params, timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 if data:
                     result = data[0]
                     lat = float(result['lat'])
@@ -185,14 +625,11 @@ class SidecarAPICollector:
                             city = parts[1] if parts[1] != zipcode else (parts[2] if len(parts) > 2 else "")
                     
                     # Cache the result
-                    self.geocoding_cache[cache_key] = {
+                    self.add_geocoding_entries({cache_key: {
                         'lat': lat,
                         'lng': lng,
                         'city': city
-                    }
-                    
-                    # Add a small delay to be respectful to the free API
-                    time.sleep(0.1)
+                    }})
                     
                     return lat, lng, city
             
@@ -201,19 +638,54 @@ class SidecarAPICollector:
         
         return None
     
+    def prefill_geocoding_cache(self, zipcodes: List[str], state: str) -> int:
+        """Fill cache misses for a state in one offline lookup against the GeoNames postal code table (pgeocode)"""
+        missing = [zipcode for zipcode in zipcodes if f"{zipcode}_{state}" not in self.geocoding_cache]
+        if not missing:
+            return 0
+        
+        # pgeocode is optional; without it, misses fall back to Nominatim one by one
+        try:
+            import pgeocode
+        except ImportError:
+            logger.info(f"💡 pgeocode not installed - geocoding {len(missing)} uncached {state} zip codes via API")
+            return 0
+        
+        try:
+            results = pgeocode.Nominatim('us').query_postal_code(missing)
+        except Exception as e:
+            logger.warning(f"Offline geocoding lookup failed for {state}: {e}")
+            return 0
+        
+        entries = {}
+        for zipcode, lat, lng, city in zip(missing, results['latitude'], results['longitude'], results['place_name']):
+            if pd.isna(lat) or pd.isna(lng):
+                continue
+            entries[f"{zipcode}_{state}"] = {
+                'lat': float(lat),
+                'lng': float(lng),
+                'city': city if isinstance(city, str) else ""
+            }
+        
+        added = len(entries)
+        if entries:
+            self.add_geocoding_entries(entries)
+        logger.info(f"📍 Geocoded {added}/{len(missing)} uncached {state} zip codes offline")
+        return added
+    
     def read_zipcode_file(self, filename: str, state: str, batch_info: dict = None) -> List[str]:
         """Read zip codes from a text file, optionally filtering by batch"""
         try:
-            with open(filename, 'r') as f:
-                zipcodes = [line.strip() for line in f if line.strip()]
+            start_idx, end_idx = 0, None
             
             # Apply batch filtering if specified
             if batch_info and batch_info.get('batch_num') and batch_info.get('total_batches'):
                 batch_num = batch_info['batch_num']
                 total_batches = batch_info['total_batches']
                 
-                # Calculate batch size and start/end indices
-                total_zips = len(zipcodes)
+                # Count zip codes with a cheap binary pass so only this batch's lines are kept below
+                with open(filename, 'rb') as f:
+                    total_zips = sum(1 for line in f if line.strip())
                 batch_size = total_zips // total_batches
                 remainder = total_zips % total_batches
                 
@@ -227,14 +699,20 @@ class SidecarAPICollector:
                 # Calculate end index for this batch
                 current_batch_size = batch_size + (1 if batch_num <= remainder else 0)
                 end_idx = start_idx + current_batch_size
-                
-                # Extract the batch
-                zipcodes = zipcodes[start_idx:end_idx]
-                logger.info(f"🎯 {state} Batch {batch_num}/{total_batches}: {len(zipcodes)} zip codes (indices {start_idx}-{end_idx-1})")
             
             # In test mode, only take first 2 zip codes
+            read_end = end_idx
+            if self.test_mode:
+                read_end = start_idx + 2 if end_idx is None else min(end_idx, start_idx + 2)
+            
+            # Stream the file and keep only the requested slice of zip codes
+            with open(filename, 'r') as f:
+                zipcodes = list(islice((line.strip() for line in f if line.strip()), start_idx, read_end))
+            
+            if end_idx is not None:
+                logger.info(f"🎯 {state} Batch {batch_num}/{total_batches}: {current_batch_size} zip codes (indices {start_idx}-{end_idx-1})")
+            
             if self.test_mode:
-                zipcodes = zipcodes[:2]
                 logger.info(f"TEST MODE: Using only first {len(zipcodes)} zip codes from {filename}")
             else:
                 if not batch_info:
@@ -245,7 +723,7 @@ class SidecarAPICollector:
             logger.error(f"Error reading {filename}: {e}")
             return []
 
-    def get_zip_codes_with_coordinates(self, states_filter: List[str] = None, batch_info: dict = None) -> List[Dict]:
+    def get_zip_codes_with_coordinates(self, states_filter: List[str] = None, batch_info: dict = None) -> List[ZipLocation]:
         """Return list of zip codes with their coordinates for specified states"""
         all_zip_data = []
         
@@ -284,22 +762,35 @@ class SidecarAPICollector:
             if not batch_info:
                 logger.info(f"Processing {len(zipcodes)} zip codes for {state}")
             
-            for i, zipcode in enumerate(zipcodes):
-                if not self.test_mode and i % 100 == 0:
-                    logger.info(f"Geocoding progress for {state}: {i}/{len(zipcodes)}")
-                    # Save cache periodically
-                    self.save_geocoding_cache()
-                
-                coordinates = self.geocode_zipcode(zipcode, state)
+            # Resolve cache misses in bulk before falling back to per-zip HTTP lookups
+            self.prefill_geocoding_cache(zipcodes, state)
+            
+            # Whatever is still missing goes to Nominatim from a few threads; the shared
+            # geocoding_rate_limiter keeps them within the 1 req/sec policy
+            missing = [zipcode for zipcode in zipcodes if f"{zipcode}_{state}" not in self.geocoding_cache]
+            lookups = {}
+            if missing:
+                logger.info(f"🌐 Geocoding {len(missing)} uncached {state} zip codes via API")
+                with ThreadPoolExecutor(max_workers=self.geocoding_workers) as executor:
+                    futures = {executor.submit(self.geocode_zipcode, zipcode, state): zipcode for zipcode in missing}
+                    for i, future in enumerate(as_completed(futures), 1):
+                        lookups[futures[future]] = future.result()
+                        if not self.test_mode and i % 100 == 0:
+                            logger.info(f"Geocoding progress for {state}: {i}/{len(missing)}")
+                            # Save cache periodically
+                            self.save_geocoding_cache()
+            
+            for zipcode in zipcodes:
+                coordinates = lookups[zipcode] if zipcode in lookups else self.geocode_zipcode(zipcode, state)
                 if coordinates:
                     lat, lng, city = coordinates
-                    all_zip_data.append({
-                        'zip': zipcode,
-                        'lat': lat,
-                        'lng': lng,
-                        'state': state,
-                        'city': city or f"{state}_City"
-                    })
+                    all_zip_data.append(ZipLocation(
+                        zip=zipcode,
+                        lat=lat,
+                        lng=lng,
+                        state=state,
+                        city=city or f"{state}_City"
+                    ))
                     
                     if self.test_mode:
                         logger.info(f"✅ Test geocoded: {zipcode}, {state} -> {city} ({lat}, {lng})")
@@ -310,6 +801,9 @@ class SidecarAPICollector:
             self.save_geocoding_cache()
             logger.info(f"Completed geocoding for {state}")
         
+        # Persist whatever is left below the flush threshold
+        self.save_geocoding_cache(force=True)
+        
         if self.test_mode:
             logger.info(f"🧪 TEST MODE: Total zip codes with coordinates: {len(all_zip_data)}")
         else:
@@ -329,21 +823,10 @@ class SidecarAPICollector:
         # If not found, try to run grab_token.sh to get the token
         logger.info("TOKEN not found in environment, running grab_token.sh...")
         try:
-            # Run the grab_token.sh script
-            result = subprocess.run(['./grab_token.sh'], 
-                                  capture_output=True, 
-                                  text=True, 
-                                  check=True)
-            
-            # Parse the output to extract the token
-            output_lines = result.stdout.strip().split('\n')
-            for line in output_lines:
-                if line.startswith('TOKEN='):
-                    token = line.split('=', 1)[1]
-                    # Clean the token of any extra whitespace, quotes, or newlines
-                    token = token.strip().strip('"').strip("'")
-                    logger.info("Successfully obtained TOKEN from grab_token.sh")
-                    return token
+            token = _fetch_credentials().get('token')
+            if token:
+                logger.info("Successfully obtained TOKEN from grab_token.sh")
+                return token
             
             # If we couldn't find TOKEN= in the output, try to get it from environment
             # after running the script (in case it was exported)
@@ -375,24 +858,13 @@ class SidecarAPICollector:
             # Clean the member_uuid of any extra whitespace, quotes, or newlines
             return member_uuid.strip().strip('"').strip("'")
         
-        # If not found, try to run grab_token.sh to get the memberUUID
-        logger.info("MEMBERUUID not found in environment, running grab_token.sh...")
+        # If not found, reuse the grab_token.sh output already fetched for the token
+        logger.info("MEMBERUUID not found in environment, using grab_token.sh output...")
         try:
-            # Run the grab_token.sh script
-            result = subprocess.run(['./grab_token.sh'], 
-                                  capture_output=True, 
-                                  text=True, 
-                                  check=True)
-            
-            # Parse the output to extract the memberUUID
-            output_lines = result.stdout.strip().split('\n')
-            for line in output_lines:
-                if line.startswith('MEMBERUUID='):
-                    member_uuid = line.split('=', 1)[1]
-                    # Clean the member_uuid of any extra whitespace, quotes, or newlines
-                    member_uuid = member_uuid.strip().strip('"').strip("'")
-                    logger.info("Successfully obtained MEMBERUUID from grab_token.sh")
-                    return member_uuid
+            member_uuid = _fetch_credentials().get('member_uuid')
+            if member_uuid:
+                logger.info("Successfully obtained MEMBERUUID from grab_token.sh")
+                return member_uuid
             
             # If we couldn't find MEMBERUUID= in the output, try to get it from environment
             # after running the script (in case it was exported)
@@ -416,49 +888,57 @@ class SidecarAPICollector:
             raise
     
 
-    def load_drugs_from_excel(self, filepath: str) -> List[Dict]:
+    def load_drugs_from_excel(self, filepath: str) -> List[Drug]:
         """Load drug data from CSV file and lookup UUIDs from cache"""
         try:
-            # Read CSV with PROCEDURE_CODE as string to preserve leading zeros
-            df = pd.read_csv(filepath, dtype={'PROCEDURE_CODE': str})
             drugs = []
             
-            # In test mode, only take first 10 drugs
             if self.test_mode:
-                df = df.head(10)
                 logger.info(f"🧪 TEST MODE: Using only first 10 drugs from CSV file")
-            else:
-                logger.info(f"Loaded {len(df)} drugs from CSV file")
             
             skipped_count = 0
             skipped_drugs = []
             loaded_count = 0
+            row_count = 0
             
-            for idx, row in df.iterrows():
-                procedure_code = str(row['PROCEDURE_CODE'])
-                drug_name = row['DRUG_NAME_WITH_FORM_STRENGTH']
-                
-                # Look up UUID from cache
-                care_uuid = self.uuid_cache.get(procedure_code)
-                
-                if not care_uuid:
-                    skipped_count += 1
-                    skipped_drugs.append(f"{procedure_code} - {drug_name}")
-                    logger.error(f"❌ SKIPPING drug #{idx+1}: No UUID in cache for {procedure_code} - {drug_name}")
-                    continue
-                
-                drugs.append({
-                    'procedure_code': procedure_code,
-                    'uuid': care_uuid,
-                    'drug_name': drug_name,
-                    'dosage_form': row['DOSAGE_FORM'],
-                    'total_benefit_amount': row['TOTAL_BENEFIT_AMOUNT'],
-                    'claim_count': row['CLAIM_COUNT']
-                })
-                
-                loaded_count += 1
-                if self.test_mode and loaded_count <= 5:
-                    logger.info(f"✅ Loaded drug #{idx+1}: {drug_name} -> UUID: {care_uuid}")
+            # Read rows as plain strings, which also preserves leading zeros in PROCEDURE_CODE,
+            # and build each Drug straight from the reader instead of holding every row first.
+            # Rows stay plain lists; the needed columns are picked out by position in one call
+            with open(filepath, 'r', newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                header = next(reader)
+                get_columns = itemgetter(*(header.index(column) for column in DRUG_COLUMNS))
+                # In test mode, only take first 10 drugs
+                for idx, row in enumerate(islice(reader, 10) if self.test_mode else reader):
+                    row_count += 1
+                    procedure_code, drug_name, dosage_form, total_benefit_amount, claim_count = get_columns(row)
+                    
+                    # Look up UUID from cache
+                    care_uuid = self.uuid_cache.get(procedure_code)
+                    
+                    if not care_uuid:
+                        skipped_count += 1
+                        skipped_drugs.append(f"{procedure_code} - {drug_name}")
+                        logger.error(f"❌ SKIPPING drug #{idx+1}: No UUID in cache for {procedure_code} - {drug_name}")
+                        continue
+                    
+                    drugs.append(Drug(
+                        procedure_code=procedure_code,
+                        uuid=care_uuid,
+                        drug_name=drug_name,
+                        # Lowercased once here rather than on every API request
+                        search_query=drug_name.lower(),
+                        dosage_form=dosage_form,
+                        total_benefit_amount=total_benefit_amount,
+                        claim_count=claim_count
+                    ))
+                    
+                    loaded_count += 1
+                    if self.test_mode and loaded_count <= 5:
+                        logger.info(f"✅ Loaded drug #{idx+1}: {drug_name} -> UUID: {care_uuid}")
+            
+            if not self.test_mode:
+                logger.info(f"Loaded {row_count} drugs from CSV file")
             
             # Summary logging
             if skipped_count > 0:
@@ -478,50 +958,85 @@ class SidecarAPICollector:
             raise
     
     def load_progress(self) -> Dict:
-        """Load progress from file"""
-        if os.path.exists(self.progress_file):
-            try:
-                with open(self.progress_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.warning(f"Could not load progress file: {e}")
-        return {'completed': [], 'total_processed': 0}
+        """Load progress from file, with completed combinations as a set for O(1) lookups"""
+        completed = set()
+        try:
+            if os.path.exists(self.progress_file):
+                with open(self.progress_file, 'r', encoding='utf-8') as f:
+                    completed.update(line.rstrip('\n') for line in f)
+                completed.discard('')
+            elif os.path.exists(self.legacy_progress_file):
+                # Carry a JSON progress file from an earlier version over into the log
+                with open(self.legacy_progress_file, 'rb') as f:
+                    completed.update(orjson.loads(f.read()).get('completed', []))
+                with open(self.progress_file, 'w', encoding='utf-8') as f:
+                    f.writelines(f"{key}\n" for key in sorted(completed))
+                logger.info(f"📦 Converted {self.legacy_progress_file} to {self.progress_file}")
+        except Exception as e:
+            logger.warning(f"Could not load progress file: {e}")
+        return {'completed': completed, 'total_processed': len(completed)}
     
     def save_progress(self, progress: Dict):
-        """Save progress to file"""
+        """Append the combinations completed since the last checkpoint to the progress log"""
         try:
-            with open(self.progress_file, 'w') as f:
-                json.dump(progress, f)
+            # Rows for every completed combination must be on disk before the
+            # checkpoint claims them, so let the writer thread catch up and flush first
+            if self._csv_fh is not None:
+                self._csv_queue.join()
+                if self._csv_error is not None:
+                    logger.error("❌ Not checkpointing progress: rows since the last checkpoint were not written")
+                    return
+                self._csv_fh.flush()
+            
+            if self._progress_log is None:
+                # A crash mid-append can leave a partial last line; start on a fresh line so
+                # it never merges with the next key (the fragment itself matches nothing)
+                partial_line = False
+                if os.path.exists(self.progress_file) and os.path.getsize(self.progress_file) > 0:
+                    with open(self.progress_file, 'rb') as f:
+                        f.seek(-1, os.SEEK_END)
+                        partial_line = f.read(1) != b'\n'
+                self._progress_log = open(self.progress_file, 'a', encoding='utf-8')
+                if partial_line:
+                    self._progress_log.write('\n')
+            self._progress_log.write(''.join(f"{key}\n" for key in self._unsaved_keys))
+            self._progress_log.flush()
+            self._unsaved_keys.clear()
+            self._progress_dirty = 0
         except Exception as e:
             logger.error(f"Could not save progress: {e}")
     
-    def refresh_token(self) -> bool:
+    def flush_progress(self):
+        """Checkpoint the current run's progress if anything changed since the last save"""
+        if self._progress is not None and self._progress_dirty:
+            self.save_progress(self._progress)
+    
+    def refresh_token(self, stale_token: Optional[str] = None) -> bool:
         """Refresh token by running grab_token.sh"""
+        with self._token_lock:
+            # Another worker may already have refreshed the token this request failed with
+            if stale_token is not None and stale_token != self.token:
+                logger.info("🔄 Token was already refreshed by another worker")
+                return True
+            return self._refresh_token()
+    
+    def _refresh_token(self) -> bool:
+        """Run grab_token.sh and swap in the new token; callers must hold _token_lock"""
         try:
             logger.info("🔄 Token expired or invalid. Refreshing token...")
             
-            # Run the grab_token.sh script
-            result = subprocess.run(['./grab_token.sh'], 
-                                  capture_output=True, 
-                                  text=True, 
-                                  check=True)
-            
-            # Parse the output to extract the new token and memberUUID
-            output_lines = result.stdout.strip().split('\n')
-            new_token = None
-            new_member_uuid = None
-            
-            for line in output_lines:
-                if line.startswith('TOKEN='):
-                    new_token = line.split('=', 1)[1].strip().strip('"').strip("'")
-                elif line.startswith('MEMBERUUID='):
-                    new_member_uuid = line.split('=', 1)[1].strip().strip('"').strip("'")
+            # Drop the memoized output so grab_token.sh runs again for fresh credentials
+            _fetch_credentials.cache_clear()
+            credentials = _fetch_credentials()
+            new_token = credentials.get('token')
+            new_member_uuid = credentials.get('member_uuid')
             
             if new_token and new_member_uuid:
                 # Update instance variables
                 self.token = new_token
                 self.headers['token'] = new_token
                 self.static_params['memberUuid'] = new_member_uuid
+                self._static_query = urlencode(self.static_params)
                 
                 # Also update environment variables
                 os.environ['TOKEN'] = new_token
@@ -541,37 +1056,141 @@ class SidecarAPICollector:
             logger.error(f"❌ Error refreshing token: {e}")
             return False
 
-    def make_api_request(self, zip_code: str, lat: float, lng: float, drug_uuid: str, drug_name: str = '') -> Optional[Dict]:
-        """Make API request with retry logic and automatic token refresh"""
-        params = self.static_params.copy()
-        params.update({
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for a retry attempt, so workers don't retry in lockstep"""
+        return random.uniform(0, min(self.max_retry_delay, self.retry_delay * 2 ** attempt))
+    
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header given either as seconds or as an HTTP date"""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, retry_at.timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+    
+    @staticmethod
+    def parse_rate_limit_interval(value: str) -> Optional[float]:
+        """Parse an X-Rate-Limit-Interval header such as '1s', '1m' or '60' into seconds"""
+        value = value.strip().lower()
+        multiplier = {'s': 1, 'm': 60, 'h': 3600}.get(value[-1:], None)
+        try:
+            return float(value[:-1]) * multiplier if multiplier else float(value)
+        except ValueError:
+            return None
+    
+    def observe_rate_limit_headers(self, headers) -> None:
+        """Follow the rate the API declares and pause all workers when it reports its window exhausted"""
+        # Some APIs declare their budget as X-Rate-Limit-Limit requests per X-Rate-Limit-Interval;
+        # track it (split across parallel jobs) but never go above our own configured ceiling.
+        # Windows longer than a minute are left to hourly_quota
+        limit = headers.get('X-Rate-Limit-Limit') or headers.get('X-RateLimit-Limit')
+        interval = headers.get('X-Rate-Limit-Interval') or headers.get('X-RateLimit-Interval')
+        if limit is not None and interval is not None:
+            try:
+                interval_seconds = self.parse_rate_limit_interval(interval)
+                if interval_seconds and interval_seconds <= 60:
+                    declared_rate = float(limit) / interval_seconds / self.parallel_jobs
+                    rate = min(self.max_requests_per_second, declared_rate)
+                    if rate > 0 and abs(rate - self.api_rate_limiter.refill_rate) > 1e-9:
+                        logger.info(f"⚙️  API declares {limit} requests per {interval}, pacing at {rate:.2f} req/s")
+                        self.api_rate_limiter.set_rate(rate)
+            except ValueError:
+                pass
+        
+        remaining = headers.get('X-RateLimit-Remaining') or headers.get('X-Rate-Limit-Remaining')
+        reset = headers.get('X-RateLimit-Reset') or headers.get('X-Rate-Limit-Reset')
+        if remaining is None or reset is None:
+            return
+        try:
+            remaining = int(float(remaining))
+            reset = float(reset)
+        except ValueError:
+            return
+        if remaining > 0:
+            return
+        # Reset is either seconds until the window resets or an epoch timestamp
+        wait_seconds = reset - time.time() if reset > 1e9 else reset
+        if wait_seconds > 0:
+            logger.warning(f"⏳ API reports rate limit exhausted, pausing requests for {wait_seconds:.1f} seconds")
+            self.api_rate_limiter.pause(min(wait_seconds, self.hourly_quota.window))
+    
+    def send_api_request(self, url: str):
+        """GET an API url, racing a hedged duplicate against it if it is slower than hedge_after"""
+        if not self.hedge_after:
+            return self.api_client.get(url, headers=self.headers, timeout=30)
+        
+        first = self._hedge_executor.submit(self.api_client.get, url, headers=self.headers, timeout=30)
+        done, _ = wait([first], timeout=self.hedge_after)
+        if done or not self._hedge_slots.acquire(blocking=False):
+            return first.result()
+        try:
+            self.hourly_quota.wait()
+            self.api_rate_limiter.acquire()
+            if first.done():
+                return first.result()
+            # The duplicate is counted against the hourly quota whether or not it wins
+            self.hourly_quota.record()
+            self.hedged_count += 1
+            second = self._hedge_executor.submit(self.api_client.get, url, headers=self.headers, timeout=30)
+            done, _ = wait([first, second], return_when=FIRST_COMPLETED)
+            winner = done.pop()
+            # A request that raised loses to the other one, which may still succeed
+            if winner.exception() is not None:
+                winner = second if winner is first else first
+            # The slower request cannot be aborted mid-flight; it finishes in the background
+            return winner.result()
+        finally:
+            self._hedge_slots.release()
+    
+    def make_api_request(self, zip_code: str, lat: float, lng: float, drug_uuid: str, search_query: str = '') -> Optional[Dict]:
+        """Make API request with retry logic and automatic token refresh; returns NOT_SENT if the run stopped before it could be sent"""
+        # Append the per-request parameters to the pre-encoded static query string
+        request_params = urlencode({
             'uuid': drug_uuid,
             'zipCode': zip_code,
             'locationLat': str(lat), 
             'locationLong': str(lng),
-            'searchedQuery': drug_name.lower() if drug_name else 'prescription',
-            'intentCallId': str(uuid.uuid4())
+            'searchedQuery': search_query or 'prescription',
+            'intentCallId': _new_intent_call_id()
         })
         
         token_refreshed_this_request = False
         
         for attempt in range(self.max_retries):
+            # While the API looks down, hold the request until the breaker lets it through
+            # instead of burning retries on it; a breaker wait never counts as an attempt
+            if not self.api_breaker.wait_until_allowed(self._stopping):
+                return NOT_SENT
+            request_token = self.token
             try:
-                logger.info(f"Making API request for zip {zip_code} (attempt {attempt + 1})")
-                response = requests.get(
-                    self.base_url, 
-                    params=params, 
-                    headers=self.headers,
-                    timeout=30
-                )
+                self.hourly_quota.wait()
+                self.api_rate_limiter.acquire()
+                if attempt or self.test_mode:
+                    logger.info(f"Making API request for zip {zip_code} (attempt {attempt + 1})")
+                response = self.send_api_request(f"{self.base_url}?{self._static_query}&{request_params}")
+                self.observe_rate_limit_headers(response.headers)
+                # Any answer short of a server error means the API itself is up
+                if response.status_code >= 500:
+                    self.api_breaker.record_failure()
+                else:
+                    self.api_breaker.record_success()
                 
                 if response.status_code == 200:
-                    return response.json()
+                    self.hourly_quota.record()
+                    # orjson parses the raw bytes directly, skipping requests' text decoding
+                    return orjson.loads(response.content)
                 elif response.status_code == 401:  # Unauthorized - token expired
                     logger.warning(f"🔑 Authentication failed for zip {zip_code} - token expired/invalid")
                     if not token_refreshed_this_request:  # Only refresh once per request
                         logger.info("🔄 Attempting token refresh...")
-                        if self.refresh_token():
+                        if self.refresh_token(request_token):
                             token_refreshed_this_request = True
                             logger.info("✅ Token refreshed, retrying request...")
                             continue  # Retry with new token
@@ -585,7 +1204,7 @@ class SidecarAPICollector:
                     logger.warning(f"🚫 Access forbidden for zip {zip_code} - checking token...")
                     if not token_refreshed_this_request:
                         logger.info("🔄 Attempting token refresh for 403 error...")
-                        if self.refresh_token():
+                        if self.refresh_token(request_token):
                             token_refreshed_this_request = True
                             logger.info("✅ Token refreshed, retrying request...")
                             continue
@@ -596,8 +1215,12 @@ class SidecarAPICollector:
                         logger.error("❌ Still getting 403 after token refresh")
                         return None
                 elif response.status_code == 429:  # Rate limited
-                    logger.warning(f"⏳ Rate limited for zip {zip_code}, waiting longer...")
-                    time.sleep(self.retry_delay * 2)  # Wait 4 seconds on rate limit
+                    # Honor the server's Retry-After when it sends one
+                    delay = self.parse_retry_after(response.headers.get('Retry-After'))
+                    if delay is None:
+                        delay = self.backoff_delay(attempt + 1)
+                    logger.warning(f"⏳ Rate limited for zip {zip_code}, waiting {delay:.1f} seconds...")
+                    time.sleep(delay)
                     continue
                 else:
                     logger.error(f"❌ API request failed for zip {zip_code}: {response.status_code} - {response.text}")
@@ -605,38 +1228,48 @@ class SidecarAPICollector:
                     if 'token' in response.text.lower() or 'unauthorized' in response.text.lower():
                         if not token_refreshed_this_request:
                             logger.info("🔄 Error mentions token, attempting refresh...")
-                            if self.refresh_token():
+                            if self.refresh_token(request_token):
                                 token_refreshed_this_request = True
                                 continue
+                    # Other client errors will not succeed on a retry; only 5xx responses do
+                    if response.status_code < 500:
+                        return None
                     
-            except requests.exceptions.Timeout as e:
+            except self._timeout_errors as e:
+                self.api_breaker.record_failure()
                 logger.warning(f"⏰ Request timeout for zip {zip_code}: {e}")
                 # Timeout could indicate token expiry, try refresh on first timeout
                 if attempt == 0 and not token_refreshed_this_request:
                     logger.info("🔄 Timeout on first attempt, checking token...")
-                    if self.refresh_token():
+                    if self.refresh_token(request_token):
                         token_refreshed_this_request = True
                         logger.info("✅ Token refreshed after timeout, retrying...")
                         continue
                         
-            except requests.exceptions.RequestException as e:
+            except orjson.JSONDecodeError as e:
+                logger.error(f"❌ Invalid JSON in API response for zip {zip_code}: {e}")
+                
+            except self._request_errors as e:
+                self.api_breaker.record_failure()
                 logger.error(f"❌ Request exception for zip {zip_code}: {e}")
                 # Check if connection errors could be auth-related
                 if 'unauthorized' in str(e).lower() and not token_refreshed_this_request:
                     logger.info("🔄 Connection error may be auth-related, trying token refresh...")
-                    if self.refresh_token():
+                    if self.refresh_token(request_token):
                         token_refreshed_this_request = True
                         continue
                 
             if attempt < self.max_retries - 1:
-                logger.info(f"⏳ Retrying in {self.retry_delay} seconds...")
-                time.sleep(self.retry_delay)
+                self.retry_count += 1
+                delay = self.backoff_delay(attempt)
+                logger.info(f"⏳ Retrying in {delay:.1f} seconds...")
+                time.sleep(delay)
         
         logger.error(f"❌ All retry attempts failed for zip {zip_code}")
         return None
     
-    def extract_pharmacy_data(self, api_response: Dict, drug_info: Dict, zip_info: Dict) -> List[Dict]:
-        """Extract comprehensive pharmacy data from API response"""
+    def extract_pharmacy_data(self, api_response: Dict, drug_info: Drug, zip_info: ZipLocation) -> List[tuple]:
+        """Extract comprehensive pharmacy data from API response as rows in PHARMACY_COLUMNS order"""
         rows = []
         
         if not api_response or 'pharmacies' not in api_response:
@@ -655,7 +1288,7 @@ class SidecarAPICollector:
         non_facility_addon_benefit_amount = api_response.get('nonFacilityAddOnBenefitAmount', 0)
         
         # Extract drug description details
-        description_data = api_response.get('description', {})
+        description_data = api_response.get('description') or EMPTY_DICT
         drug_description = description_data.get('description', '')
         brand_name = description_data.get('brandName', '')
         generic_name = description_data.get('genericName', '')
@@ -669,56 +1302,60 @@ class SidecarAPICollector:
         # Extract form options
         form_options = []
         for form in api_response.get('form', []):
+            query_map = form.get('queryMap') or EMPTY_DICT
             form_data = {
                 'label': form.get('label', ''),
                 'selected': form.get('selected', False),
-                'gsn': form.get('queryMap', {}).get('gsn', ''),
-                'strength': form.get('queryMap', {}).get('strength', ''),
-                'qty': form.get('queryMap', {}).get('qty', ''),
-                'branded_or_generic_id': form.get('queryMap', {}).get('brandedOrGenericId', '')
+                'gsn': query_map.get('gsn', ''),
+                'strength': query_map.get('strength', ''),
+                'qty': query_map.get('qty', ''),
+                'branded_or_generic_id': query_map.get('brandedOrGenericId', '')
             }
             form_options.append(form_data)
         
         # Extract dosage options
         dosage_options = []
         for dosage in api_response.get('dosage', []):
+            query_map = dosage.get('queryMap') or EMPTY_DICT
             dosage_data = {
                 'label': dosage.get('label', ''),
                 'selected': dosage.get('selected', False),
-                'gsn': dosage.get('queryMap', {}).get('gsn', ''),
-                'strength': dosage.get('queryMap', {}).get('strength', ''),
-                'form': dosage.get('queryMap', {}).get('form', ''),
-                'qty': dosage.get('queryMap', {}).get('qty', ''),
-                'branded_or_generic_id': dosage.get('queryMap', {}).get('brandedOrGenericId', '')
+                'gsn': query_map.get('gsn', ''),
+                'strength': query_map.get('strength', ''),
+                'form': query_map.get('form', ''),
+                'qty': query_map.get('qty', ''),
+                'branded_or_generic_id': query_map.get('brandedOrGenericId', '')
             }
             dosage_options.append(dosage_data)
         
         # Extract quantity options
         quantity_options = []
         for quantity in api_response.get('quantity', []):
+            query_map = quantity.get('queryMap') or EMPTY_DICT
             quantity_data = {
                 'label': quantity.get('label', ''),
                 'selected': quantity.get('selected', False),
-                'gsn': quantity.get('queryMap', {}).get('gsn', ''),
-                'qty': quantity.get('queryMap', {}).get('qty', ''),
-                'branded_or_generic_id': quantity.get('queryMap', {}).get('brandedOrGenericId', '')
+                'gsn': query_map.get('gsn', ''),
+                'qty': query_map.get('qty', ''),
+                'branded_or_generic_id': query_map.get('brandedOrGenericId', '')
             }
             quantity_options.append(quantity_data)
         
         # Extract brand options
         brand_options = []
         for brand in api_response.get('brand', []):
+            query_map = brand.get('queryMap') or EMPTY_DICT
             brand_data = {
                 'label': brand.get('label', ''),
                 'selected': brand.get('selected', False),
-                'branded_or_generic_id': brand.get('queryMap', {}).get('brandedOrGenericId', ''),
-                'drug_name': brand.get('queryMap', {}).get('drugName', ''),
-                'drug_detail_customized': brand.get('queryMap', {}).get('drugDetailCustomized', '')
+                'branded_or_generic_id': query_map.get('brandedOrGenericId', ''),
+                'drug_name': query_map.get('drugName', ''),
+                'drug_detail_customized': query_map.get('drugDetailCustomized', '')
             }
             brand_options.append(brand_data)
         
         # Extract member information
-        member_info = api_response.get('memberInfo', {})
+        member_info = api_response.get('memberInfo') or EMPTY_DICT
         member_uuid = member_info.get('uuid', '')
         member_zip_code = member_info.get('zipCode', '')
         member_prescriptions_covered = member_info.get('prescriptionsCovered', False)
@@ -758,206 +1395,258 @@ class SidecarAPICollector:
         quantity_options_json = json.dumps(quantity_options)
         brand_options_json = json.dumps(brand_options)
             
-        for pharmacy in api_response.get('pharmacies', []):
-            # Extract pharmacy address details
-            pharmacy_address = pharmacy.get('address', {})
-            pharmacy_street = pharmacy_address.get('street', '')
-            pharmacy_city = pharmacy_address.get('city', '')
-            pharmacy_state = pharmacy_address.get('state', '')
-            pharmacy_zip = pharmacy_address.get('zip', '')
-            pharmacy_lon = pharmacy_address.get('lon', 0)
-            pharmacy_lat = pharmacy_address.get('lat', 0)
-            
-            # Extract hours of operation
-            hours_of_operation = []
-            for hours in pharmacy.get('hoursOfOperation', []):
-                hours_data = {
-                    'day': hours.get('day', ''),
-                    'hours': hours.get('hours', '')
-                }
-                hours_of_operation.append(hours_data)
-            hours_of_operation_json = json.dumps(hours_of_operation)
-            
-            # Extract care estimate result details
-            care_estimate = pharmacy.get('careEstimateResult', {})
-            
-            row = {
-                'timestamp': datetime.now().isoformat(),
-                'state': zip_info['state'],
-                'zip_code': zip_info['zip'],
-                'city': zip_info['city'],
-                'lat': zip_info['lat'],
-                'lng': zip_info['lng'],
-                
-                # Original drug information
-                'procedure_code': drug_info['procedure_code'],
-                'drug_name': drug_info['drug_name'],
-                'dosage_form': drug_info['dosage_form'],
-                'claim_count_orig': drug_info['claim_count'],
-                
-                # Enhanced drug information from API
-                'api_drug_title': drug_title,
-                'api_drug_name': drug_name,
-                'brand_name': brand_name,
-                'generic_name': generic_name,
-                'selected_ndc': selected_ndc,
-                'generic_or_branded_id': generic_or_branded_id,
-                
-                # Drug description details
-                'drug_description': drug_description,
-                'admin_instructions': admin_instructions,
-                'contraindications': contraindications,
-                'side_effects': side_effects,
-                'interactions': interactions,
-                'monitoring_instructions': monitoring_instructions,
-                'missed_dose_instructions': missed_dose_instructions,
-                
-                # Cost and benefit information
-                'facility_benefit_amount': facility_benefit_amount,
-                'non_facility_benefit_amount': non_facility_benefit_amount,
-                'facility_should_cost': facility_should_cost,
-                'non_facility_should_cost': non_facility_should_cost,
-                'facility_addon_should_cost': facility_addon_should_cost,
-                'non_facility_addon_should_cost': non_facility_addon_should_cost,
-                'facility_addon_benefit_amount': facility_addon_benefit_amount,
-                'non_facility_addon_benefit_amount': non_facility_addon_benefit_amount,
-                
-                # Drug options (as JSON strings)
-                'form_options': form_options_json,
-                'dosage_options': dosage_options_json,
-                'quantity_options': quantity_options_json,
-                'brand_options': brand_options_json,
-                
-                # Member information
-                'member_uuid': member_uuid,
-                'member_zip_code': member_zip_code,
-                'member_prescriptions_covered': member_prescriptions_covered,
-                'member_medical_area_factor': member_medical_area_factor,
-                'member_policy_uuid': member_policy_uuid,
-                'member_policy_coverage_status': member_policy_coverage_status,
-                'member_insurance_filing_uuid': member_insurance_filing_uuid,
-                'member_maternity_start_date': member_maternity_start_date,
-                'member_maternity_care_covered': member_maternity_care_covered,
-                'member_skip_deductible_eligible': member_skip_deductible_eligible,
-                'member_insurance_product': member_insurance_product,
-                'member_rating_area': member_rating_area,
-                'member_zero_reimbursement_policy_status': member_zero_reimbursement_policy_status,
-                
-                # Coverage metadata
-                'prescriptions_covered': prescriptions_covered,
-                'category_slug': category_slug,
-                'pregnancy_complication': pregnancy_complication,
-                'drug_coverage_required': drug_coverage_required,
-                'maternity_covered': maternity_covered,
-                'preventive_type': preventive_type,
-                'otc_drug': otc_drug,
-                'is_cover_at_cost': is_cover_at_cost,
-                'is_deductible_skipped': is_deductible_skipped,
-                'is_maternity_eligible': is_maternity_eligible,
-                'care_status': care_status,
-                'conditionally_covered_type': conditionally_covered_type,
-                'ignore_rating_area_factor': ignore_rating_area_factor,
-                'monitoring_id': monitoring_id,
-                'category': category,
-                
-                # Pharmacy information
-                'pharmacy_name': pharmacy.get('name', ''),
-                'pharmacy_phone': pharmacy.get('phone', ''),
-                'pharmacy_street': pharmacy_street,
-                'pharmacy_city': pharmacy_city,
-                'pharmacy_state': pharmacy_state,
-                'pharmacy_zip': pharmacy_zip,
-                'pharmacy_lon': pharmacy_lon,
-                'pharmacy_lat': pharmacy_lat,
-                'pharmacy_distance': pharmacy.get('distance', 0),
-                'pharmacy_rate': pharmacy.get('pharmacyRate', 0),
-                'price_fairness': pharmacy.get('priceFairness', ''),
-                'pharmacy_image': pharmacy.get('image', ''),
-                'hours_of_operation': hours_of_operation_json,
-                
-                # Pharmacy-specific drug details
-                'pharmacy_gsn': pharmacy.get('gsn', ''),
-                'pharmacy_ndc': pharmacy.get('ndc', ''),
-                'pharmacy_qty': pharmacy.get('qty', 0),
-                
-                # Care estimate results
-                'provider_price': care_estimate.get('providerPrice', 0),
-                'estimated_member_responsibility': care_estimate.get('estimatedMemberResponsibility', 0),
-                'earned_benefit': care_estimate.get('earnedBenefit', 0),
-                'applied_to_deductible': care_estimate.get('appliedToDeductible', 0),
-                'savings': care_estimate.get('savings', 0),
-                'bill_over_benefit_amount': care_estimate.get('billOverBenefitAmount', 0),
-            }
-            rows.append(row)
-            
-        return rows
-    
-    def initialize_csv(self) -> List[str]:
-        """Initialize CSV file with comprehensive headers"""
-        headers = [
-            # Basic location and timing info
-            'timestamp', 'state', 'zip_code', 'city', 'lat', 'lng',
+        # Everything except the pharmacy columns is the same for every row of this
+        # response, so build it once (in PHARMACY_COLUMNS order) and extend it per pharmacy
+        base_row = (
+            datetime.now().isoformat(),
+            zip_info.state,
+            zip_info.zip,
+            zip_info.city,
+            zip_info.lat,
+            zip_info.lng,
             
             # Original drug information
-            'procedure_code', 'drug_name', 'dosage_form', 'claim_count_orig',
+            drug_info.procedure_code,
+            drug_info.drug_name,
+            drug_info.dosage_form,
+            drug_info.claim_count,
             
             # Enhanced drug information from API
-            'api_drug_title', 'api_drug_name', 'brand_name', 'generic_name', 
-            'selected_ndc', 'generic_or_branded_id',
+            drug_title,
+            drug_name,
+            brand_name,
+            generic_name,
+            selected_ndc,
+            generic_or_branded_id,
             
             # Drug description details
-            'drug_description', 'admin_instructions', 'contraindications', 
-            'side_effects', 'interactions', 'monitoring_instructions', 'missed_dose_instructions',
+            drug_description,
+            admin_instructions,
+            contraindications,
+            side_effects,
+            interactions,
+            monitoring_instructions,
+            missed_dose_instructions,
             
             # Cost and benefit information
-            'facility_benefit_amount', 'non_facility_benefit_amount', 'facility_should_cost', 
-            'non_facility_should_cost', 'facility_addon_should_cost', 'non_facility_addon_should_cost',
-            'facility_addon_benefit_amount', 'non_facility_addon_benefit_amount',
+            facility_benefit_amount,
+            non_facility_benefit_amount,
+            facility_should_cost,
+            non_facility_should_cost,
+            facility_addon_should_cost,
+            non_facility_addon_should_cost,
+            facility_addon_benefit_amount,
+            non_facility_addon_benefit_amount,
             
             # Drug options (as JSON strings)
-            'form_options', 'dosage_options', 'quantity_options', 'brand_options',
+            form_options_json,
+            dosage_options_json,
+            quantity_options_json,
+            brand_options_json,
             
             # Member information
-            'member_uuid', 'member_zip_code', 'member_prescriptions_covered', 'member_medical_area_factor',
-            'member_policy_uuid', 'member_policy_coverage_status', 'member_insurance_filing_uuid',
-            'member_maternity_start_date', 'member_maternity_care_covered', 'member_skip_deductible_eligible',
-            'member_insurance_product', 'member_rating_area', 'member_zero_reimbursement_policy_status',
+            member_uuid,
+            member_zip_code,
+            member_prescriptions_covered,
+            member_medical_area_factor,
+            member_policy_uuid,
+            member_policy_coverage_status,
+            member_insurance_filing_uuid,
+            member_maternity_start_date,
+            member_maternity_care_covered,
+            member_skip_deductible_eligible,
+            member_insurance_product,
+            member_rating_area,
+            member_zero_reimbursement_policy_status,
             
             # Coverage metadata
-            'prescriptions_covered', 'category_slug', 'pregnancy_complication', 'drug_coverage_required',
-            'maternity_covered', 'preventive_type', 'otc_drug', 'is_cover_at_cost', 'is_deductible_skipped',
-            'is_maternity_eligible', 'care_status', 'conditionally_covered_type', 'ignore_rating_area_factor',
-            'monitoring_id', 'category',
+            prescriptions_covered,
+            category_slug,
+            pregnancy_complication,
+            drug_coverage_required,
+            maternity_covered,
+            preventive_type,
+            otc_drug,
+            is_cover_at_cost,
+            is_deductible_skipped,
+            is_maternity_eligible,
+            care_status,
+            conditionally_covered_type,
+            ignore_rating_area_factor,
+            monitoring_id,
+            category,
+        )
             
-            # Pharmacy information
-            'pharmacy_name', 'pharmacy_phone', 'pharmacy_street', 'pharmacy_city', 'pharmacy_state',
-            'pharmacy_zip', 'pharmacy_lon', 'pharmacy_lat', 'pharmacy_distance', 'pharmacy_rate',
-            'price_fairness', 'pharmacy_image', 'hours_of_operation',
+        for pharmacy in api_response.get('pharmacies', []):
+            # A pharmacy without a care estimate has no price data; writing it would only
+            # add a row of zeros that reads as $0 member responsibility downstream
+            care_estimate = pharmacy.get('careEstimateResult')
+            if not care_estimate:
+                continue
             
-            # Pharmacy-specific drug details
-            'pharmacy_gsn', 'pharmacy_ndc', 'pharmacy_qty',
+            # Extract hours of operation
+            hours_of_operation_json = json.dumps([
+                {'day': hours.get('day', ''), 'hours': hours.get('hours', '')}
+                for hours in pharmacy.get('hoursOfOperation', [])
+            ])
             
-            # Care estimate results
-            'provider_price', 'estimated_member_responsibility', 'earned_benefit', 'applied_to_deductible',
-            'savings', 'bill_over_benefit_amount'
-        ]
-        
+            # Pharmacy information, pharmacy-specific drug details and care estimate
+            # results, each group read in a single call (the shared empty dict stands
+            # in for a missing address); the short groups are joined before the long base row
+            rows.append(base_row + (
+                get_pharmacy_contact(pharmacy)
+                + get_pharmacy_address(pharmacy.get('address') or EMPTY_DICT)
+                + get_pharmacy_listing(pharmacy)
+                + (hours_of_operation_json,)
+                + get_pharmacy_drug(pharmacy)
+                + get_care_estimate(care_estimate)
+            ))
+            
+        return rows
+    
+    def initialize_csv(self) -> List[str]:
+        """Initialize CSV file with comprehensive headers and open it for the rest of the run"""
         # Create CSV file with headers if it doesn't exist
-        if not os.path.exists(self.output_file):
-            with open(self.output_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(headers)
+        write_header = not os.path.exists(self.output_file)
+        
+        # Keep a single buffered handle open instead of reopening the file for every
+        # combination; rows are flushed every csv_flush_rows and when the run ends
+        if self.compress_output:
+            # Level 1 keeps compression cheap next to the API calls while still cutting bytes written
+            self._csv_fh = gzip.open(self.output_file, 'at', newline='', encoding='utf-8', compresslevel=1)
+        else:
+            self._csv_fh = open(self.output_file, 'a', newline='', encoding='utf-8', buffering=1 << 20)
+        # Rows are positional tuples, so the writer skips DictWriter's per-field lookups
+        self._csv_writer = csv.writer(self._csv_fh)
+        self._rows_since_flush = 0
+        if write_header:
+            self._csv_writer.writerow(PHARMACY_COLUMNS)
+        
+        self._csv_error = None
+        self._csv_queue = queue.Queue(maxsize=64)
+        self._csv_thread = threading.Thread(target=self._csv_writer_loop, name='csv-writer', daemon=True)
+        self._csv_thread.start()
         
-        return headers
+        return PHARMACY_COLUMNS
+    
+    def _csv_writer_loop(self):
+        """Write queued row batches to the output CSV until the None sentinel arrives"""
+        while True:
+            rows = self._csv_queue.get()
+            try:
+                if rows is None:
+                    return
+                self._csv_writer.writerows(rows)
+                self._rows_since_flush += len(rows)
+                if self._rows_since_flush >= self.csv_flush_rows:
+                    self._csv_fh.flush()
+                    os.fsync(self._csv_fh.fileno())
+                    self._rows_since_flush = 0
+            except Exception as e:
+                # Keep draining so producers never block on a full queue; the error is
+                # raised on the main thread by the next append_to_csv()
+                if self._csv_error is None:
+                    logger.error(f"❌ Could not write to {self.output_file}: {e}")
+                    self._csv_error = e
+            finally:
+                self._csv_queue.task_done()
     
-    def append_to_csv(self, rows: List[Dict]):
-        """Append rows to CSV file"""
+    def append_to_csv(self, rows: List[tuple]):
+        """Queue rows for the CSV writer thread"""
+        if self._csv_error is not None:
+            raise self._csv_error
         if not rows:
             return
+        
+        self._csv_queue.put(rows)
+    
+    def close_csv(self):
+        """Drain the writer thread, then flush and close the output CSV file"""
+        if self._csv_fh is not None:
+            self._csv_queue.put(None)
+            self._csv_thread.join()
+            self._csv_fh.close()
+            self._csv_fh = None
+            self._csv_writer = None
+            self._csv_thread = None
+    
+    def record_result(self, api_response: Optional[Dict], drug: Drug, zip_info: ZipLocation,
+                      combination_key: str, progress: Dict, processed_count: int) -> int:
+        """Save one finished combination and update failure tracking and progress; returns the new processed count"""
+        if api_response:
+            # Reset consecutive failures on success
+            self.consecutive_failures = 0
             
-        with open(self.output_file, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=self.initialize_csv())
-            writer.writerows(rows)
+            # Extract and save data
+            rows = self.extract_pharmacy_data(api_response, drug, zip_info)
+            if rows:
+                self.append_to_csv(rows)
+                self.rows_saved += len(rows)
+                if self.test_mode:
+                    logger.info(f"Saved {len(rows)} pharmacy records")
+            else:
+                logger.warning(f"No pharmacy data found for {drug.drug_name} in {zip_info.zip}")
+        else:
+            # Track failed combination
+            self.failed_count += 1
+            self.recent_failures.append(combination_key)
+            self._failure_log.write(orjson.dumps({
+                'timestamp': datetime.now().isoformat(),
+                'combination': combination_key,
+                'procedure_code': drug.procedure_code,
+                'drug_name': drug.drug_name,
+                'zip_code': zip_info.zip,
+                'state': zip_info.state,
+                'output_file': self.output_file
+            }).decode() + '\n')
+            self.consecutive_failures += 1
+            logger.error(f"❌ Failed to get data for {drug.drug_name} in {zip_info.zip} (Total failures: {self.failed_count}, Consecutive: {self.consecutive_failures})")
+            
+            # Check if we've hit the consecutive failure limit
+            if self.consecutive_failures >= self.max_consecutive_failures and not self.auto_stop_triggered:
+                self.auto_stop_triggered = True
+                self._stopping.set()
+                logger.error(f"🚨 CRITICAL: {self.consecutive_failures} consecutive API failures detected!")
+                logger.error("🛑 AUTO-STOP TRIGGERED: Too many consecutive failures")
+                logger.error("📋 Recent failed combinations:")
+                # Show last 10 failed combinations
+                for i, failed_combo in enumerate(self.recent_failures, 1):
+                    logger.error(f"   {i}. {failed_combo}")
+                logger.error(f"📄 Every failed combination is logged in {self.failure_log_file}")
+                logger.error("💡 Collection will stop after updating progress")
+                logger.error("🔧 Please check API status, network, or authentication")
+                logger.error("🚀 Restart with: ./run_collection.sh")
+        
+        # Update progress (even for failed combinations to avoid retrying them);
+        # the file itself is only rewritten every progress_flush_every combinations
+        progress['completed'].add(combination_key)
+        self._unsaved_keys.append(combination_key)
+        progress['total_processed'] = processed_count + 1
+        self._progress_dirty += 1
+        if self._progress_dirty >= self.progress_flush_every:
+            self.save_progress(progress)
+        
+        return processed_count + 1
+    
+    def get_cached_response(self, drug: Drug, zip_info: ZipLocation) -> Optional[Dict]:
+        """Return the stored API response for a combination if the response cache has a fresh one"""
+        if self.response_cache is None:
+            return None
+        entry = self.response_cache.get(f"{drug.uuid}:{zip_info.zip}")
+        if entry is None:
+            return None
+        entry = orjson.loads(entry)
+        if time.time() - entry['fetched_at'] > self.response_cache_max_age:
+            return None
+        return entry['response']
+    
+    def cache_response(self, drug: Drug, zip_info: ZipLocation, api_response: Dict):
+        """Store a successful API response in the response cache, if one is open"""
+        if self.response_cache is not None:
+            self.response_cache[f"{drug.uuid}:{zip_info.zip}"] = orjson.dumps({
+                'fetched_at': time.time(),
+                'response': api_response
+            })
     
     def run_collection(self, csv_filepath: str, states_filter: List[str] = None):
         """Main collection process"""
@@ -969,94 +1658,131 @@ class SidecarAPICollector:
         # Load data
         drugs = self.load_drugs_from_excel(csv_filepath)
         zip_codes = self.get_zip_codes_with_coordinates(states_filter, self.batch_info)
+        # Walk drugs in a fixed order so resumed runs pick up where they left off, and
+        # walk zip codes by state and 3-digit prefix so consecutive requests for a drug
+        # stay in one area (assumed to help whatever caching sits in front of the API)
+        drugs.sort(key=attrgetter('procedure_code'))
+        zip_codes.sort(key=lambda zip_info: (zip_info.state, zip_info.zip[:3], zip_info.zip))
         progress = self.load_progress()
+        self._progress = progress
         
         # Initialize CSV
         self.initialize_csv()
         
         total_combinations = len(drugs) * len(zip_codes)
+        # Long runs are bound by the hourly quota rather than the per-second bucket
+        requests_per_second = self.api_rate_limiter.refill_rate
+        if total_combinations > self.hourly_quota.limit:
+            requests_per_second = min(requests_per_second, self.hourly_quota.limit / self.hourly_quota.window)
         if self.test_mode:
             logger.info(f"🧪 TEST MODE: Total combinations to process: {total_combinations}")
             logger.info(f"🧪 TEST MODE: Using {len(drugs)} drugs × {len(zip_codes)} zip codes")
-            logger.info(f"🧪 TEST MODE: Estimated runtime: {total_combinations * self.request_delay:.1f} seconds (~{(total_combinations * self.request_delay)/60:.1f} minutes)")
+            logger.info(f"🧪 TEST MODE: Estimated runtime: {total_combinations / requests_per_second:.1f} seconds (~{(total_combinations / requests_per_second)/60:.1f} minutes)")
         else:
             logger.info(f"Total combinations to process: {total_combinations}")
-            logger.info(f"Estimated runtime: {total_combinations * self.request_delay:.1f} seconds (~{(total_combinations * self.request_delay)/60:.1f} minutes)")
+            logger.info(f"Estimated runtime: {total_combinations / requests_per_second:.1f} seconds (~{(total_combinations / requests_per_second)/60:.1f} minutes)")
         
         processed_count = progress.get('total_processed', 0)
+        submitted_count = processed_count
+        completed = progress['completed']
+        mode_indicator = "🧪 TEST: " if self.test_mode else ""
         
-        for drug_idx, drug in enumerate(drugs):
-            for zip_idx, zip_info in enumerate(zip_codes):
-                combination_key = f"{drug['procedure_code']}_{zip_info['zip']}"
-                
-                # Skip if already processed
-                if combination_key in progress.get('completed', []):
+        # Requests run on the worker pool; results are written back here on the main
+        # thread, so the CSV, progress file and failure counters have a single writer.
+        # At most max_in_flight combinations are outstanding at any time
+        max_in_flight = self.max_workers * 2
+        in_flight = {}
+        
+        def drain(return_when):
+            nonlocal processed_count
+            done, _ = wait(in_flight, return_when=return_when)
+            for future in done:
+                drug, zip_info, combination_key = in_flight.pop(future)
+                if future.cancelled():
                     continue
-                
-                mode_indicator = "🧪 TEST: " if self.test_mode else ""
-                logger.info(f"{mode_indicator}Processing {processed_count + 1}/{total_combinations}: {drug['drug_name']} in {zip_info['city']}, {zip_info['state']} ({zip_info['zip']})")
+                api_response = future.result()
+                if api_response is NOT_SENT:
+                    continue
+                if api_response:
+                    self.cache_response(drug, zip_info, api_response)
+                processed_count = self.record_result(api_response, drug, zip_info,
+                                                     combination_key, progress, processed_count)
+        
+        # Expand the remaining work once up front, skipping combinations already processed;
+        # each drug's key prefix is built once rather than formatted for every zip code
+        pending = []
+        for drug in drugs:
+            key_prefix = f"{drug.procedure_code}_"
+            pending.extend([
+                (drug, zip_info, combination_key)
+                for zip_info in zip_codes
+                if (combination_key := key_prefix + zip_info.zip) not in completed
+            ])
+        
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for drug, zip_info, combination_key in pending:
+                # Wait for a free slot before queueing another request
+                while len(in_flight) >= max_in_flight and not self.auto_stop_triggered:
+                    drain(FIRST_COMPLETED)
                 
                 # Check if auto-stop was triggered
                 if self.auto_stop_triggered:
+                    # Drop queued requests that have not started; finished ones are still recorded
+                    for future in in_flight:
+                        future.cancel()
+                    drain(ALL_COMPLETED)
                     logger.error("🛑 AUTO-STOP: Collection halted due to too many consecutive API failures")
-                    logger.error(f"📊 Total failed combinations: {len(self.failed_combinations)}")
+                    logger.error(f"📊 Total failed combinations: {self.failed_count}")
                     logger.error(f"📊 Consecutive failures before stop: {self.consecutive_failures}")
                     logger.error("💡 Please check API status and restart manually when ready")
                     return
                 
-                # Make API request
-                api_response = self.make_api_request(
-                    zip_info['zip'], 
-                    zip_info['lat'], 
-                    zip_info['lng'],
-                    drug['uuid'],
-                    drug['drug_name']
-                )
+                submitted_count += 1
+                if self.test_mode or submitted_count % self.log_every == 0:
+                    logger.info(f"{mode_indicator}Processing {submitted_count}/{total_combinations}: {drug.drug_name} in {zip_info.city}, {zip_info.state} ({zip_info.zip})"
+                                f" - {self.rows_saved} pharmacy records saved, {self.failed_count} failures so far")
                 
-                if api_response:
-                    # Reset consecutive failures on success
-                    self.consecutive_failures = 0
-                    
-                    # Extract and save data
-                    rows = self.extract_pharmacy_data(api_response, drug, zip_info)
-                    if rows:
-                        self.append_to_csv(rows)
-                        logger.info(f"Saved {len(rows)} pharmacy records")
-                    else:
-                        logger.warning(f"No pharmacy data found for {drug['drug_name']} in {zip_info['zip']}")
-                else:
-                    # Track failed combination
-                    self.failed_combinations.append(combination_key)
-                    self.consecutive_failures += 1
-                    logger.error(f"❌ Failed to get data for {drug['drug_name']} in {zip_info['zip']} (Total failures: {len(self.failed_combinations)}, Consecutive: {self.consecutive_failures})")
-                    
-                    # Check if we've hit the consecutive failure limit
-                    if self.consecutive_failures >= self.max_consecutive_failures:
-                        self.auto_stop_triggered = True
-                        logger.error(f"🚨 CRITICAL: {self.consecutive_failures} consecutive API failures detected!")
-                        logger.error("🛑 AUTO-STOP TRIGGERED: Too many consecutive failures")
-                        logger.error("📋 Recent failed combinations:")
-                        # Show last 10 failed combinations
-                        recent_failures = self.failed_combinations[-self.max_consecutive_failures:]
-                        for i, failed_combo in enumerate(recent_failures, 1):
-                            logger.error(f"   {i}. {failed_combo}")
-                        logger.error("💡 Collection will stop after updating progress")
-                        logger.error("🔧 Please check API status, network, or authentication")
-                        logger.error("🚀 Restart with: ./run_collection.sh")
-                
-                # Update progress (even for failed combinations to avoid retrying them)
-                progress['completed'].append(combination_key)
-                progress['total_processed'] = processed_count + 1
-                self.save_progress(progress)
-                
-                processed_count += 1
+                # A recent response fetched by an earlier run is recorded straight away
+                cached = self.get_cached_response(drug, zip_info)
+                if cached is not None:
+                    processed_count = self.record_result(cached, drug, zip_info,
+                                                         combination_key, progress, processed_count)
+                    continue
                 
-                # Rate limiting
-                time.sleep(self.request_delay)
+                # Make API request (rate limited by api_rate_limiter inside the worker)
+                future = executor.submit(
+                    self.make_api_request,
+                    zip_info.zip, 
+                    zip_info.lat, 
+                    zip_info.lng,
+                    drug.uuid,
+                    drug.search_query
+                )
+                in_flight[future] = (drug, zip_info, combination_key)
+            
+            # Collect whatever is still outstanding
+            drain(ALL_COMPLETED)
+        finally:
+            # Workers still waiting on the circuit breaker give up rather than hold up the
+            # shutdown, and requests queued behind them are dropped unsent
+            self._stopping.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+            # However the loop ends (finished, auto-stop, Ctrl-C or an error), checkpoint
+            # progress and get every buffered row onto disk
+            self.flush_progress()
+            self.close_csv()
+            if self.response_cache is not None:
+                self.response_cache.close()
+                self.response_cache = None
+            self._failure_log.close()
+            # Losing hedged duplicates may still be in flight; don't wait for them
+            if self.hedge_after:
+                self._hedge_executor.shutdown(wait=False, cancel_futures=True)
         
         if self.auto_stop_triggered:
             logger.error("🛑 Collection stopped due to consecutive failure auto-stop trigger")
-            logger.error(f"📊 Total failures: {len(self.failed_combinations)}")
+            logger.error(f"📊 Total failures: {self.failed_count}")
             logger.error(f"📊 Consecutive failures: {self.consecutive_failures}")
             logger.error(f"📁 Output file: {self.output_file}")
             logger.error(f"🔄 Progress saved: {processed_count} combinations processed")
@@ -1067,8 +1793,12 @@ class SidecarAPICollector:
         else:
             logger.info(f"Collection completed! Output file: {self.output_file}")
             logger.info(f"Total processed: {processed_count}")
-            if len(self.failed_combinations) > 0:
-                logger.warning(f"⚠️ Note: {len(self.failed_combinations)} combinations failed during collection")
+            logger.info(f"Pharmacy records saved this run: {self.rows_saved}")
+            logger.info(f"API request retries after errors: {self.retry_count}")
+            if self.hedge_after:
+                logger.info(f"Hedged API requests: {self.hedged_count}")
+            if self.failed_count > 0:
+                logger.warning(f"⚠️ Note: {self.failed_count} combinations failed during collection")
 
 def main():
     parser = argparse.ArgumentParser(description='Sidecar Health API Data Collection')
@@ -1082,6 +1812,20 @@ def main():
                        help='Batch number to process (1-based). Must be used with --total-batches')
     parser.add_argument('--total-batches', type=int, 
                        help='Total number of batches to split each state into. Must be used with --batch')
+    parser.add_argument('--parallel-jobs', type=int, default=1,
+                       help='Number of collection processes running at the same time; each uses 1/N of the API rate limits (default: 1)')
+    parser.add_argument('--workers', type=int, default=16,
+                       help='Number of API requests kept in flight at once; the rate limits still apply (default: 16)')
+    parser.add_argument('--response-cache',
+                       help='File of saved API responses: combinations with a recent response there are not requested again, '
+                            'new responses are added')
+    parser.add_argument('--hedge-after', type=float,
+                       help='Send one duplicate of an API request that has not answered after this many seconds '
+                            'and use whichever response arrives first (default: off)')
+    parser.add_argument('--response-cache-max-age', type=float, default=24,
+                       help='Hours a saved API response stays usable with --response-cache (default: 24)')
+    parser.add_argument('--gzip', action='store_true',
+                       help='Write the output as a gzip-compressed .csv.gz file')
     
     args = parser.parse_args()
     
@@ -1094,6 +1838,14 @@ def main():
         logger.error(f"Batch number must be between 1 and {args.total_batches}")
         return
     
+    if args.parallel_jobs < 1:
+        logger.error("--parallel-jobs must be at least 1")
+        return
+    
+    if args.workers < 1:
+        logger.error("--workers must be at least 1")
+        return
+    
     # Create batch info if specified
     batch_info = None
     if args.batch and args.total_batches:
@@ -1102,7 +1854,14 @@ def main():
             'total_batches': args.total_batches
         }
     
-    collector = SidecarAPICollector(test_mode=args.test, states_filter=args.states, batch_info=batch_info)
+    collector = SidecarAPICollector(test_mode=args.test, states_filter=args.states, batch_info=batch_info,
+                                    parallel_jobs=args.parallel_jobs, response_cache_file=args.response_cache,
+                                    max_workers=args.workers, response_cache_max_age=args.response_cache_max_age * 3600,
+                                    hedge_after=args.hedge_after, compress_output=args.gzip)
+    
+    # Turn SIGTERM (e.g. from kill or a job scheduler) into a normal exit, so buffered
+    # rows and the last progress checkpoint are still written on the way out
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
     
     if not os.path.exists(args.csv_file):
         logger.error(f"CSV file not found: {args.csv_file}")
@@ -1,8 +1,50 @@
 #!/usr/bin/env python3
+import mmap
 import re
 import pandas as pd
 from pathlib import Path
 
+# Pattern to match the error lines, compiled once for the whole scan; it works on the raw
+# UTF-8 bytes of the log so nothing but the captured fields ever needs decoding
+FAILED_DATA_PATTERN = re.compile(r'❌ Failed to get data for (.+?) in (\d+) \(Total failures: \d+, Consecutive: \d+\)'.encode('utf-8'))
+FAILED_DATA_PREFIX = '❌ Failed to get data for'.encode('utf-8')
+
+def scan_failed_data_lines(log, text_output, unique_pairs):
+    """
+    Search the memory-mapped log for failed-data lines, writing each one to text_output and
+    adding its (zipcode, drug name) pair to unique_pairs; returns (matched, skipped) counts
+    """
+    matched_count = 0
+    skipped_count = 0
+    line_num = 1
+    counted_to = 0
+    position = 0
+    # Jump between occurrences of the literal prefix instead of splitting and decoding the
+    # log line by line
+    while (prefix_start := log.find(FAILED_DATA_PREFIX, position)) != -1:
+        # Widen the hit to its whole line, then resume after that line
+        line_start = log.rfind(b'\n', 0, prefix_start) + 1
+        line_end = log.find(b'\n', prefix_start)
+        if line_end == -1:
+            line_end = len(log)
+        position = line_end + 1
+        if log.find(b'Total failures:', prefix_start, line_end) == -1:
+            continue
+        
+        line = log[line_start:line_end].strip()
+        text_output.write(line + b'\n')
+        matched_count += 1
+        match = FAILED_DATA_PATTERN.search(log, line_start, line_end)
+        if match:
+            unique_pairs[(match.group(2).decode('utf-8').strip(), match.group(1).decode('utf-8').strip())] = None
+        else:
+            # Line numbers are only counted up to the lines that need reporting
+            line_num += log[counted_to:line_start].count(b'\n')
+            counted_to = line_start
+            print(f"Warning: Could not parse line {line_num}: {line.decode('utf-8', 'replace')}")
+            skipped_count += 1
+    return matched_count, skipped_count
+
 def extract_failed_data_errors(log_file_path):
     """
     Extract lines with failed data extraction errors from the log file.
@@ -14,58 +56,41 @@ def extract_failed_data_errors(log_file_path):
         print(f"Error: Log file '{log_file_path}' not found.")
         return
     
-    # Pattern to match the error lines
-    pattern = r'❌ Failed to get data for (.+?) in (\d+) \(Total failures: \d+, Consecutive: \d+\)'
-    
-    matched_lines = []
-    extracted_data = []
+    # Unique (zipcode, drug name) pairs, deduplicated while scanning; a dict keeps them
+    # in first-seen order, matching what drop_duplicates used to produce
+    unique_pairs = {}
+    matched_count = 0
+    skipped_count = 0
     
     print(f"Reading log file: {log_file_path}")
     
     try:
-        with open(log_file_path, 'r', encoding='utf-8') as file:
-            for line_num, line in enumerate(file, 1):
-                # Check if line matches our pattern
-                if '❌ Failed to get data for' in line and 'Total failures:' in line:
-                    matched_lines.append(line.strip())
-                    
-                    # Extract drug name and zipcode using regex
-                    match = re.search(pattern, line)
-                    if match:
-                        drug_name = match.group(1).strip()
-                        zipcode = match.group(2).strip()
-                        extracted_data.append({
-                            'zipcode': zipcode,
-                            'drug_name': drug_name
-                        })
-                    else:
-                        print(f"Warning: Could not parse line {line_num}: {line.strip()}")
-        
-        print(f"Found {len(matched_lines)} matching error lines")
-        
-        # Save to text file
+        # Raw error lines go straight to the text file as they are found
         text_output_file = "failed_data_extraction_errors.txt"
-        with open(text_output_file, 'w', encoding='utf-8') as f:
-            for line in matched_lines:
-                f.write(line + '\n')
+        with open(log_file_path, 'rb') as file, open(text_output_file, 'wb') as text_output:
+            # An empty file cannot be memory-mapped, and has nothing to scan anyway
+            if Path(log_file_path).stat().st_size:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as log:
+                    matched_count, skipped_count = scan_failed_data_lines(log, text_output, unique_pairs)
+        
+        print(f"Found {matched_count} matching error lines")
+        if skipped_count:
+            print(f"Warning: {skipped_count} error lines could not be parsed")
         print(f"Raw error lines saved to: {text_output_file}")
         
         # Create CSV with structured data
-        if extracted_data:
-            df = pd.DataFrame(extracted_data)
-            
-            # Remove duplicates if any
-            df_unique = df.drop_duplicates()
+        if unique_pairs:
+            df_unique = pd.DataFrame(list(unique_pairs), columns=['zipcode', 'drug_name'])
             
             csv_output_file = "failed_data_extraction.csv"
             df_unique.to_csv(csv_output_file, index=False)
             print(f"Structured data saved to: {csv_output_file}")
             
             print(f"\nSummary:")
-            print(f"  - Total error lines: {len(matched_lines)}")
+            print(f"  - Total error lines: {matched_count}")
             print(f"  - Unique combinations: {len(df_unique)}")
-            print(f"  - Unique zip codes: {df_unique['zipcode'].nunique()}")
-            print(f"  - Unique drugs: {df_unique['drug_name'].nunique()}")
+            print(f"  - Unique zip codes: {len({zipcode for zipcode, _ in unique_pairs})}")
+            print(f"  - Unique drugs: {len({drug_name for _, drug_name in unique_pairs})}")
             
             # Show sample of data
             print(f"\nFirst 10 entries:")
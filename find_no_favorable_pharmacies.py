@@ -1,10 +1,118 @@
 #!/usr/bin/env python3
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
 import sys
 import argparse
 from pathlib import Path
 
-def find_no_favorable_pharmacies(input_file, output_file):
+REQUIRED_COLUMNS = ['zip_code', 'procedure_code', 'estimated_member_responsibility', 'drug_name']
+CHUNK_ROWS = 1_000_000
+
+# Input filename marker -> state label used in the report name, checked in order
+STATE_MARKERS = [
+    ('OH_COMPLETE', 'OH'),
+    ('GA_COMPLETE', 'GA'),
+    ('FL_COMPLETE_PT1', 'FL_PT1'),
+    ('FL_COMPLETE_PT2', 'FL_PT2')
+]
+
+def collapse_groups(grouped):
+    """Reduce grouped rows to whether any is favorable and the drug name of the first row"""
+    # The drug name should be the same for all rows in a group; first(skipna=False) takes
+    # the first row's even when it is blank, like iloc[0] and the other engines do
+    return pd.DataFrame({
+        'has_favorable_pharmacy': grouped['has_favorable_pharmacy'].any(),
+        'drug_name': grouped['drug_name'].first(skipna=False)
+    })
+
+def summarize_groups(df):
+    """Reduce rows to one has_favorable_pharmacy / drug_name entry per zip and procedure code"""
+    # Convert to numeric, handling any non-numeric values, and apply the favorable
+    # pharmacy criteria
+    is_favorable = pd.to_numeric(df['estimated_member_responsibility'], errors='coerce') <= 0
+    
+    # Group by zipcode and procedure_code and reduce every group in one vectorized pass,
+    # instead of materializing a sub-DataFrame per group in a Python loop
+    return collapse_groups(df.assign(has_favorable_pharmacy=is_favorable).groupby(['zip_code', 'procedure_code']))
+
+def find_no_favorable_combinations_pandas(input_file):
+    """Return the row count and the zip/procedure combinations with no favorable pharmacy using pandas"""
+    row_count = 0
+    groups = None
+    
+    # Only parse the four columns we need out of the wide results file, in bounded chunks
+    # so files larger than memory can still be analyzed. drug_name repeats on every
+    # pharmacy row, so it is read as a categorical; zip and procedure codes are already
+    # parsed as int64 group keys, which keeps the report format unchanged
+    with pd.read_csv(input_file, usecols=REQUIRED_COLUMNS, dtype={'drug_name': 'category'},
+                     chunksize=CHUNK_ROWS) as reader:
+        for chunk in reader:
+            row_count += len(chunk)
+            # Fold each chunk's per-group summary into the running one, so memory stays
+            # bounded by the number of groups rather than the number of rows
+            summary = summarize_groups(chunk)
+            if groups is not None:
+                summary = collapse_groups(pd.concat([groups, summary]).groupby(level=['zip_code', 'procedure_code']))
+            groups = summary
+    
+    if groups is None:
+        return row_count, pd.DataFrame()
+    
+    # Find combinations with no favorable pharmacies
+    no_favorable_combinations = groups.loc[~groups['has_favorable_pharmacy'], ['drug_name']].reset_index()
+    
+    return row_count, no_favorable_combinations
+
+def find_no_favorable_combinations_pyarrow(input_file):
+    """Return the row count and the zip/procedure combinations with no favorable pharmacy using pyarrow"""
+    # Arrow's multithreaded reader parses the four needed columns in one go (the whole
+    # projection must fit in memory). The responsibility column is kept as text so the
+    # shared summary applies the same lenient numeric conversion as the pandas engine
+    table = pv.read_csv(
+        input_file,
+        convert_options=pv.ConvertOptions(
+            include_columns=REQUIRED_COLUMNS,
+            column_types={'estimated_member_responsibility': pa.string(), 'drug_name': pa.string()}
+        )
+    )
+    groups = summarize_groups(table.to_pandas())
+    
+    # Find combinations with no favorable pharmacies
+    no_favorable_combinations = groups.loc[~groups['has_favorable_pharmacy'], ['drug_name']].reset_index()
+    
+    return table.num_rows, no_favorable_combinations
+
+def find_no_favorable_combinations_polars(input_file):
+    """Return the row count and the zip/procedure combinations with no favorable pharmacy using polars"""
+    # polars is optional, so only import it when this engine is selected
+    import polars as pl
+    
+    # Lazy scan so only the four needed columns are parsed; the responsibility column is
+    # read as text and cast leniently, so non-numeric values become null like to_numeric(errors='coerce')
+    rows = pl.scan_csv(input_file, schema_overrides={'estimated_member_responsibility': pl.Utf8}).select(REQUIRED_COLUMNS)
+    is_favorable = pl.col('estimated_member_responsibility').cast(pl.Float64, strict=False) <= 0
+    
+    # Same result as the pandas engine: groups with a missing key are dropped, and the
+    # output is sorted by zip code and procedure code
+    no_favorable = (
+        rows.drop_nulls(['zip_code', 'procedure_code'])
+        .group_by(['zip_code', 'procedure_code'])
+        .agg(is_favorable.any().alias('has_favorable_pharmacy'), pl.col('drug_name').first())
+        .filter(~pl.col('has_favorable_pharmacy'))
+        .select(['zip_code', 'procedure_code', 'drug_name'])
+        .sort(['zip_code', 'procedure_code'])
+    )
+    row_count, result = pl.collect_all([rows.select(pl.len()), no_favorable], engine='streaming')
+    return row_count.item(), result.to_pandas()
+
+ENGINES = {
+    'pandas': find_no_favorable_combinations_pandas,
+    'pyarrow': find_no_favorable_combinations_pyarrow,
+    'polars': find_no_favorable_combinations_polars
+}
+
+def find_no_favorable_pharmacies(input_file, output_file, engine='pandas'):
     """
     Find zip codes and procedure codes that have no favorable pharmacies.
     Favorable pharmacy is defined as: estimated_member_responsibility <= 0
@@ -15,50 +123,25 @@ def find_no_favorable_pharmacies(input_file, output_file):
         print(f"Error: Input file '{input_file}' not found.")
         sys.exit(1)
     
+    # pandas and pyarrow decompress .csv.gz input on the fly, but polars cannot stream-scan it
+    if engine == 'polars' and str(input_file).endswith('.gz'):
+        print(f"Error: The polars engine cannot scan gzip-compressed input '{input_file}'; use --engine pandas or pyarrow.")
+        sys.exit(1)
+    
     try:
-        # Read the CSV file
+        # Check if required columns exist (only the header is read here)
         print(f"Reading data from {input_file}...")
-        df = pd.read_csv(input_file)
-        
-        # Check if required columns exist
-        required_columns = ['zip_code', 'procedure_code', 'estimated_member_responsibility', 'drug_name']
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        columns = pd.read_csv(input_file, nrows=0).columns
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in columns]
         
         if missing_columns:
             print(f"Error: Missing required columns: {missing_columns}")
-            print(f"Available columns: {list(df.columns)}")
+            print(f"Available columns: {list(columns)}")
             sys.exit(1)
         
-        print(f"Loaded {len(df)} rows of data")
-        
-        # Convert columns to numeric, handling any non-numeric values
-        df['estimated_member_responsibility'] = pd.to_numeric(df['estimated_member_responsibility'], errors='coerce')
-        
-        # Define favorable pharmacy criteria
-        df['is_favorable'] = (df['estimated_member_responsibility'] <= 0)
-        
-        # Group by zipcode and procedure_code
         print("Analyzing zip codes and procedure codes...")
-        grouped = df.groupby(['zip_code', 'procedure_code'])
-        
-        # Find combinations with no favorable pharmacies
-        no_favorable_combinations = []
-        
-        for (zip_code, procedure_code), group in grouped:
-            # Check if any pharmacy in this group is favorable
-            has_favorable_pharmacy = group['is_favorable'].any()
-            
-            if not has_favorable_pharmacy:
-                # Get the drug name (should be same for all rows in this group)
-                drug_name = group['drug_name'].iloc[0]
-                no_favorable_combinations.append({
-                    'zip_code': zip_code,
-                    'procedure_code': procedure_code,
-                    'drug_name': drug_name
-                })
-        
-        # Create output DataFrame
-        result_df = pd.DataFrame(no_favorable_combinations)
+        row_count, result_df = ENGINES[engine](input_file)
+        print(f"Loaded {row_count} rows of data")
         
         if len(result_df) == 0:
             print("Great news! All zip code and procedure code combinations have at least one favorable pharmacy.")
@@ -86,16 +169,7 @@ def generate_output_filename(input_file):
     input_name = input_path.stem  # Get filename without extension
     
     # Extract state from filename if possible
-    if 'OH_COMPLETE' in input_name:
-        state = 'OH'
-    elif 'GA_COMPLETE' in input_name:
-        state = 'GA'
-    elif 'FL_COMPLETE_PT1' in input_name:
-        state = 'FL_PT1'
-    elif 'FL_COMPLETE_PT2' in input_name:
-        state = 'FL_PT2'
-    else:
-        state = 'UNKNOWN'
+    state = next((state for marker, state in STATE_MARKERS if marker in input_name), 'UNKNOWN')
     
     # Create analysis_report directory if it doesn't exist
     output_dir = Path("analysis_report")
@@ -107,6 +181,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Find zip codes and procedure codes with no favorable pharmacies')
     parser.add_argument('input_file', help='Path to the input CSV file to analyze')
     parser.add_argument('-o', '--output', help='Output CSV file name (optional, will be auto-generated if not provided)')
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='pandas',
+                        help='Engine used to analyze the CSV (default: pandas; polars must be installed separately and cannot read .csv.gz)')
     
     args = parser.parse_args()
     
@@ -119,4 +195,4 @@ if __name__ == "__main__":
     else:
         output_file = generate_output_filename(args.input_file)
     
-    find_no_favorable_pharmacies(args.input_file, output_file) 
\ No newline at end of file
+    find_no_favorable_pharmacies(args.input_file, output_file, engine=args.engine) 
\ No newline at end of file
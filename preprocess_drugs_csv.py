@@ -6,11 +6,13 @@ Adds care_uuid column to the drugs CSV by looking up UUIDs for each procedure co
 
 import requests
 import pandas as pd
-import json
+import orjson
 import time
 import logging
 import os
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional
 
 # Create logs directory if it doesn't exist
@@ -27,6 +29,27 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Lookups run on a small thread pool but are still paced to the old 2 requests/second
+LOOKUP_WORKERS = 8
+LOOKUP_INTERVAL = 0.5
+
+class RequestPacer:
+    """Thread-safe pacer that spaces request start times at least interval seconds apart"""
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def wait(self):
+        """Block until this caller's slot comes up"""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
 class DrugUUIDProcessor:
     def __init__(self):
         self.token = self.get_token()
@@ -50,9 +73,21 @@ class DrugUUIDProcessor:
             'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36'
         }
         
-        # UUID lookup cache
+        # One pooled keep-alive session shared by the lookup threads, carrying the headers
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=LOOKUP_WORKERS, pool_maxsize=LOOKUP_WORKERS)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(self.headers)
+        self.pacer = RequestPacer(LOOKUP_INTERVAL)
+        
+        # UUID lookup cache (updated from the lookup threads, so guarded by a lock). New
+        # lookups are appended to a journal as they arrive, and the JSON file is rewritten
+        # once at the end of the run, where the journal is folded in and removed
         self.uuid_cache_file = 'uuid_cache.json'
+        self.uuid_journal_file = 'uuid_cache.jsonl'
+        self._uuid_journal = None
         self.uuid_cache = self.load_uuid_cache()
+        self.uuid_cache_lock = threading.Lock()
     
     def get_token(self) -> str:
         """Get token from environment variable or by running grab_token.sh"""
@@ -117,28 +152,63 @@ class DrugUUIDProcessor:
             raise
     
     def load_uuid_cache(self) -> Dict:
-        """Load UUID cache from file"""
+        """Load UUID cache from file, plus any lookups journaled since it was last written"""
+        cache = {}
         if os.path.exists(self.uuid_cache_file):
             try:
-                with open(self.uuid_cache_file, 'r') as f:
-                    return json.load(f)
+                with open(self.uuid_cache_file, 'rb') as f:
+                    cache = orjson.loads(f.read())
             except Exception as e:
                 logger.warning(f"Could not load UUID cache: {e}")
-        return {}
+        if os.path.exists(self.uuid_journal_file):
+            replayed = 0
+            with open(self.uuid_journal_file, 'rb') as f:
+                for line in f:
+                    try:
+                        procedure_code, uuid = orjson.loads(line)
+                    except (orjson.JSONDecodeError, ValueError):
+                        # A crash mid-append leaves at most one torn line
+                        continue
+                    cache[procedure_code] = uuid
+                    replayed += 1
+            if replayed:
+                logger.info(f"Recovered {replayed} UUID lookups from {self.uuid_journal_file}")
+        return cache
     
     def save_uuid_cache(self):
-        """Save UUID cache to file"""
+        """Save UUID cache to file and clear the journal it now contains"""
         try:
-            with open(self.uuid_cache_file, 'w') as f:
-                json.dump(self.uuid_cache, f, indent=2)
+            # Write to a temp file and swap it in, so an interrupted save never truncates the cache
+            tmp_file = f"{self.uuid_cache_file}.tmp"
+            with self.uuid_cache_lock:
+                with open(tmp_file, 'wb') as f:
+                    f.write(orjson.dumps(self.uuid_cache, option=orjson.OPT_INDENT_2))
+                os.replace(tmp_file, self.uuid_cache_file)
+                if self._uuid_journal is not None:
+                    self._uuid_journal.close()
+                    self._uuid_journal = None
+                if os.path.exists(self.uuid_journal_file):
+                    os.remove(self.uuid_journal_file)
         except Exception as e:
             logger.error(f"Could not save UUID cache: {e}")
     
+    def add_uuid_entry(self, procedure_code: str, uuid: str):
+        """Add a new lookup to the cache and append it to the journal"""
+        with self.uuid_cache_lock:
+            self.uuid_cache[procedure_code] = uuid
+            try:
+                if self._uuid_journal is None:
+                    self._uuid_journal = open(self.uuid_journal_file, 'ab')
+                self._uuid_journal.write(orjson.dumps([procedure_code, uuid]) + b'\n')
+                self._uuid_journal.flush()
+            except Exception as e:
+                logger.warning(f"Could not journal UUID lookup: {e}")
+    
     def get_care_uuid_for_procedure_code(self, procedure_code: str) -> Optional[str]:
         """Get care UUID for a given procedure code using the search API"""
         # Check cache first
         if procedure_code in self.uuid_cache:
-            logger.info(f"Using cached UUID for {procedure_code}: {self.uuid_cache[procedure_code]}")
+            logger.debug(f"Using cached UUID for {procedure_code}: {self.uuid_cache[procedure_code]}")
             return self.uuid_cache[procedure_code]
         
         try:
@@ -151,10 +221,10 @@ class DrugUUIDProcessor:
             }
             
             logger.info(f"Looking up UUID for procedure code: {procedure_code}")
-            response = requests.get(
+            self.pacer.wait()
+            response = self.session.get(
                 search_url,
                 params=params,
-                headers=self.headers,
                 timeout=30
             )
             
@@ -164,8 +234,7 @@ class DrugUUIDProcessor:
                     uuid = data['content'][0].get('uuid')
                     if uuid:
                         # Cache the result
-                        self.uuid_cache[procedure_code] = uuid
-                        self.save_uuid_cache()
+                        self.add_uuid_entry(procedure_code, uuid)
                         logger.info(f"✅ Found UUID for {procedure_code}: {uuid}")
                         return uuid
                 
@@ -191,33 +260,35 @@ class DrugUUIDProcessor:
             df = pd.read_csv(input_file)
             logger.info(f"Loaded {len(df)} drugs from {input_file}")
             
-            # Add care_uuid column
-            care_uuids = []
-            successful_lookups = 0
-            failed_lookups = 0
+            # Pull just the column the lookups need, rather than a record per row
+            procedure_codes = df['PROCEDURE_CODE'].astype(str).tolist()
             
-            for i, row in df.iterrows():
-                procedure_code = str(row['PROCEDURE_CODE'])
-                drug_name = row['DRUG_NAME_WITH_FORM_STRENGTH']
-                
-                logger.info(f"Processing {i+1}/{len(df)}: {procedure_code} - {drug_name}")
-                
-                uuid = self.get_care_uuid_for_procedure_code(procedure_code)
-                care_uuids.append(uuid)
-                
-                if uuid:
-                    successful_lookups += 1
-                else:
-                    failed_lookups += 1
-                
-                # Progress update every 10 items
-                if (i + 1) % 10 == 0:
-                    logger.info(f"Progress: {i+1}/{len(df)} - Success: {successful_lookups}, Failed: {failed_lookups}")
+            # Each distinct code is looked up once, so codes repeated across rows never
+            # cost an extra API call
+            unique_codes = list(dict.fromkeys(procedure_codes))
+            
+            uuid_map = {}
+            found = 0
+            
+            # Look the codes up concurrently over the shared session; the pacer keeps the
+            # uncached requests at the API's polite rate, and map() keeps results in order
+            with ThreadPoolExecutor(max_workers=LOOKUP_WORKERS) as executor:
+                uuids = executor.map(self.get_care_uuid_for_procedure_code, unique_codes)
                 
-                # Rate limiting - be respectful to the API
-                time.sleep(0.5)
+                for i, (procedure_code, uuid) in enumerate(zip(unique_codes, uuids)):
+                    uuid_map[procedure_code] = uuid
+                    if uuid:
+                        found += 1
+                    
+                    # Progress update every 10 items (per-item lines are left to the lookups
+                    # that actually hit the API)
+                    if (i + 1) % 10 == 0:
+                        logger.info(f"Progress: {i+1}/{len(unique_codes)} - Success: {found}, Failed: {i+1-found}")
             
-            # Add the new column
+            # Add care_uuid column, mapping every row back to its code's result
+            care_uuids = [uuid_map[procedure_code] for procedure_code in procedure_codes]
+            successful_lookups = sum(1 for uuid in care_uuids if uuid)
+            failed_lookups = len(care_uuids) - successful_lookups
             df['CARE_UUID'] = care_uuids
             
             # Save the updated CSV
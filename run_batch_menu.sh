@@ -19,10 +19,12 @@ echo "   ./run_georgia_batch2.sh # 303 zip codes, ~3.4 hours"
 echo ""
 echo "📊 SUMMARY:"
 echo "   • Each batch processes 100 drugs"
-echo "   • Rate: 2.5 requests/second (SAFE - no rate limit risk)"
+echo "   • Rate: up to 20 requests/second (token bucket, bursts of 20), at most 9,800/hour"
 echo "   • Progress tracked separately for each batch"
 echo "   • Can run batches in any order"
-echo "   • Can run multiple batches in parallel (if desired)"
+echo "   • Can run multiple batches in parallel (if desired) - add --parallel-jobs N"
+echo "     to each command so N simultaneous batches share the API rate limits"
+echo "     (each one then runs at 20/N requests/second and 9,800/N per hour)"
 echo ""
 echo "💡 RECOMMENDATION:"
 echo "   Start with shortest batch first: ./run_georgia_batch1.sh"  
@@ -31,4 +33,5 @@ echo ""
 echo "🔧 MANUAL COMMANDS:"
 echo "   python3 data_collection.py --states OH --batch 1 --total-batches 2"
 echo "   python3 data_collection.py --states FL --batch 2 --total-batches 2"
-echo "   python3 data_collection.py --states GA --batch 1 --total-batches 2" 
\ No newline at end of file
+echo "   python3 data_collection.py --states GA --batch 1 --total-batches 2"
+echo "   python3 data_collection.py --states GA --batch 2 --total-batches 2 --parallel-jobs 2  # alongside another batch" 
\ No newline at end of file
@@ -10,7 +10,8 @@ echo "   • Zip codes: ~473 (second half)"
 echo "   • Drugs: 100"
 echo "   • Total combinations: ~47,300"
 echo "   • Estimated time: ~5.2 hours"
-echo "   • Rate: 2.5 requests/second (SAFE)"
+echo "   • Rate: up to 20 requests/second (token bucket, bursts of 20), at most 9,800/hour"
+echo "     (each process gets 1/N of both with --parallel-jobs N)"
 echo ""
 echo "📝 Data Collection Features:"
 echo "   • Comprehensive endpoint data capture"
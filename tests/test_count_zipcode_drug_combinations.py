@@ -0,0 +1,81 @@
+import contextlib
+import gzip
+import io
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import count_zipcode_drug_combinations as counter
+
+# Blank zip_code / drug_name cells (plain and quoted), plus "NA" as a real drug name
+REPORT_CSV = '''zip_code,procedure_code,drug_name
+30002,2145780,Drug A
+30002,2145780,Drug A
+30002,2146080,Drug B
+,2146080,Drug B
+30003,2146080,
+30004,2146080,""
+30005,123,NA
+'''
+
+class CountCombinationsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        os.mkdir('analysis_report')
+        Path('analysis_report/report.csv').write_text(REPORT_CSV, encoding='utf-8')
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def count(self, engine, use_cache=False):
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = counter.count_zipcode_drug_combinations(engine=engine, use_cache=use_cache)
+        return sorted(zip(result['zip_code'], result['drug_name']))
+
+    def test_engines_drop_blank_keys_and_agree(self):
+        expected = [('30002', 'Drug A'), ('30002', 'Drug B'), ('30005', 'NA')]
+        engines = ['pandas', 'pyarrow']
+        try:
+            import polars  # noqa: F401
+            engines.append('polars')
+        except ImportError:
+            pass
+        for engine in engines:
+            with self.subTest(engine=engine):
+                self.assertEqual(self.count(engine), expected)
+
+    def test_gzipped_reports_are_scanned(self):
+        with gzip.open('analysis_report/more.csv.gz', 'wt', encoding='utf-8') as f:
+            f.write('zip_code,procedure_code,drug_name\n30006,1,Drug C\n')
+        expected = [('30002', 'Drug A'), ('30002', 'Drug B'), ('30005', 'NA'), ('30006', 'Drug C')]
+        for engine in ['pandas', 'pyarrow']:
+            with self.subTest(engine=engine):
+                self.assertEqual(self.count(engine), expected)
+
+    def test_polars_rejects_gzipped_reports(self):
+        Path('analysis_report/more.csv.gz').write_bytes(gzip.compress(b'zip_code,drug_name\n'))
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertIsNone(counter.count_zipcode_drug_combinations(engine='polars'))
+        self.assertIn('cannot scan gzip-compressed reports', output.getvalue())
+
+    def test_cache_is_only_written_with_the_flag(self):
+        self.count('pyarrow')
+        self.assertFalse(os.path.exists(counter.CACHE_FILE))
+        self.count('pyarrow', use_cache=True)
+        self.assertTrue(os.path.exists(counter.CACHE_FILE))
+
+    def test_cache_goes_stale_when_a_report_is_removed(self):
+        Path('analysis_report/more.csv').write_text('zip_code,drug_name\n30006,Drug C\n', encoding='utf-8')
+        self.assertIn(('30006', 'Drug C'), self.count('pyarrow', use_cache=True))
+        os.remove('analysis_report/more.csv')
+        self.assertNotIn(('30006', 'Drug C'), self.count('pyarrow', use_cache=True))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import importlib
+import logging
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+class OutageTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        # The module creates logs/ and its log file in the working directory on import
+        os.chdir(self.tmp.name)
+        self.dc = importlib.import_module('data_collection')
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_breaker_rejections_are_not_recorded_as_results(self):
+        dc = self.dc
+        with mock.patch.dict(os.environ, {'TOKEN': 'tok', 'MEMBERUUID': 'mem'}):
+            collector = dc.SidecarAPICollector(test_mode=True, max_workers=16)
+
+        # Every call to the API answers 500
+        calls = []
+        calls_lock = threading.Lock()
+        def get(url, **kwargs):
+            with calls_lock:
+                calls.append(url)
+            return mock.Mock(status_code=500, headers={}, text='Internal Server Error')
+        collector.api_client = mock.Mock(get=get)
+        collector.api_rate_limiter = dc.TokenBucket(refill_rate=1000, capacity=1000)
+        collector.api_breaker = dc.CircuitBreaker(failure_threshold=10, recovery_timeout=0.01)
+        collector.backoff_delay = lambda attempt: 0
+
+        drugs = [dc.Drug(f'{code}', f'uuid-{code}', f'Drug {code}', '', 'tablet', '1', '1') for code in range(2)]
+        zip_codes = [dc.ZipLocation(f'30{index:03d}', 33.0, -84.0, 'GA', 'Atlanta') for index in range(200)]
+        with mock.patch.object(collector, 'load_drugs_from_excel', return_value=drugs), \
+             mock.patch.object(collector, 'get_zip_codes_with_coordinates', return_value=zip_codes):
+            collector.run_collection('drugs.csv')
+
+        self.assertTrue(collector.auto_stop_triggered)
+        completed = Path(collector.progress_file).read_text(encoding='utf-8').split()
+        # Only combinations that failed on every attempt are recorded; the ones the breaker
+        # held back are left for the next run
+        self.assertEqual(len(completed), collector.failed_count)
+        self.assertGreaterEqual(len(calls), collector.failed_count * collector.max_retries)
+        self.assertLess(len(completed), len(drugs) * len(zip_codes))
+        # Every recorded failure is on disk once the run has ended
+        self.assertTrue(collector._failure_log.closed)
+        failures = Path(collector.failure_log_file).read_text(encoding='utf-8').splitlines()
+        self.assertEqual(len(failures), collector.failed_count)
+
+if __name__ == '__main__':
+    unittest.main()